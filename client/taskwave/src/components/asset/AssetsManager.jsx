@@ -59,3 +59,25 @@ export const removeAsset = async (assetId) => {
     method: "DELETE",
   });
 };
+
+// Downloads go through the API so access is checked; the link needs the
+// token, so the file is fetched and handed to the browser as a blob.
+export const downloadAsset = async (asset) => {
+  const response = await fetch(asset.download_url, {
+    headers: { Authorization: `Bearer ${getToken()}` },
+  });
+
+  if (!response.ok) {
+    const errData = await response.json().catch(() => ({}));
+    throw new Error(errData.detail || "Failed to download asset");
+  }
+
+  const url = URL.createObjectURL(await response.blob());
+  const link = document.createElement("a");
+  link.href = url;
+  link.download = asset.filename;
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  URL.revokeObjectURL(url);
+};
@@ -10,6 +10,7 @@ import { AiOutlinePaperClip } from "react-icons/ai";
 import AddAssetModal from "../../task/task detail/task modals/AddAssetModal";
 import { useApi } from "../../../hooks/useApi";
 import ConfirmationModal from "../../modals/ConfirmationModal";
+import { downloadAsset } from "../../asset/AssetsManager";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000";
 
@@ -68,6 +69,14 @@ const ProjectAssets = ({ projectId }) => {
     }
   };
 
+  const handleDownloadAsset = async (asset) => {
+    try {
+      await downloadAsset(asset);
+    } catch (err) {
+      console.error("Download failed:", err);
+    }
+  };
+
   const confirmRemoveAsset = (asset) => {
     setAssetToDelete(asset);
     setModalOpen(true);
@@ -99,15 +108,7 @@ const ProjectAssets = ({ projectId }) => {
     return "📎";
   };
 
-  const getFileName = (fileUrl) => {
-    if (typeof fileUrl === "string") {
-      return fileUrl.split("/").pop();
-    }
-    if (fileUrl && fileUrl.name) {
-      return fileUrl.name;
-    }
-    return "Unknown file";
-  };
+  const getFileName = (asset) => asset?.filename || "Unknown file";
 
   const assetsList = assets || [];
 
@@ -149,7 +150,7 @@ const ProjectAssets = ({ projectId }) => {
       ) : assetsList.length > 0 ? (
         <div className="space-y-3">
           {assetsList.map((asset) => {
-            const filename = getFileName(asset.file);
+            const filename = getFileName(asset);
             const isDeleting = deletingAssetId === asset.id;
 
             return (
@@ -180,14 +181,13 @@ const ProjectAssets = ({ projectId }) => {
                 </div>
 
                 <div className="flex items-center gap-1 flex-shrink-0">
-                  <a
-                    href={asset.file}
-                    download
+                  <button
+                    onClick={() => handleDownloadAsset(asset)}
                     className="p-2 text-gray-500 hover:text-blue-600 hover:bg-blue-50 rounded-lg transition-colors"
                     title="Download asset"
                   >
                     <FaDownload size={14} />
-                  </a>
+                  </button>
                   <button
                     onClick={() => confirmRemoveAsset(asset)}
                     disabled={isDeleting}
@@ -228,7 +228,7 @@ const ProjectAssets = ({ projectId }) => {
         isOpen={modalOpen}
         title="Delete Asset?"
         message={`Are you sure you want to remove "${
-          assetToDelete ? getFileName(assetToDelete.file) : ""
+          assetToDelete ? getFileName(assetToDelete) : ""
         }"?`}
         onConfirm={handleConfirmDelete}
         onCancel={handleCancelDelete}
@@ -2,7 +2,7 @@ import { useNavigate } from "react-router-dom";
 import { FaArrowRight, FaList, FaRegClock } from "react-icons/fa6";
 import Avatar from "../../common/Avatar";
 
-const ProjectTasks = ({ projectId, tasks = [] }) => {
+const ProjectTasks = ({ projectId, tasks = [], total = tasks.length }) => {
   const navigate = useNavigate();
 
   const getStatusClass = (status) =>
@@ -37,7 +37,7 @@ const ProjectTasks = ({ projectId, tasks = [] }) => {
   });
 
   const displayTasks = sortedTasks.slice(0, 5);
-  const remainingTasksCount = Math.max(0, tasks.length - 5);
+  const remainingTasksCount = Math.max(0, total - displayTasks.length);
 
   const handleViewAllTasks = () => {
     navigate(`/project/${projectId}/tasks`);
@@ -47,7 +47,7 @@ const ProjectTasks = ({ projectId, tasks = [] }) => {
     navigate(`/tasks/${taskId}`);
   };
 
-  if (tasks.length === 0) {
+  if (total === 0) {
     return (
       <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
         <h2 className="text-lg font-semibold text-gray-900 mb-4 flex items-center gap-2">
@@ -69,9 +69,9 @@ const ProjectTasks = ({ projectId, tasks = [] }) => {
       <div className="flex items-center justify-between mb-4">
         <h2 className="text-lg font-semibold text-gray-900 flex items-center gap-2">
           <FaList className="w-5 h-5" />
-          Tasks ({tasks.length})
+          Tasks ({total})
         </h2>
-        {tasks.length > 10 && (
+        {total > 10 && (
           <button
             onClick={handleViewAllTasks}
             className="text-blue-600 hover:text-blue-700 text-sm font-medium flex items-center gap-1 hover:bg-blue-50 px-2 py-1 rounded-lg transition-colors"
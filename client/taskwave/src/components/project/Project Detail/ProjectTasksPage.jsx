@@ -1,6 +1,7 @@
 import React, { useState, useMemo } from "react";
 import { useParams, useNavigate, Link } from "react-router-dom";
 import ClipLoader from "react-spinners/ClipLoader";
+import { toast } from "react-toastify";
 import {
   FaPlus,
   FaFolder,
@@ -9,6 +10,7 @@ import {
   FaRegFolder,
 } from "react-icons/fa6";
 import { useApi } from "../../../hooks/useApi";
+import { useLoadMore } from "../../../hooks/useLoadMore";
 import TaskCard from "../../task/TaskCard";
 import TaskFilter from "../../task/TaskFilter";
 
@@ -37,6 +39,7 @@ const ProjectTasksPage = () => {
     if (activeTab === "Created by me") query.append("created_by_me", "true");
 
     if (sortBy) query.append("ordering", sortBy);
+    query.append("expand", "assignees,assets");
 
     return query.toString();
   };
@@ -50,16 +53,26 @@ const ProjectTasksPage = () => {
   } = useApi(id ? `${API_BASE_URL}/api/project/${id}/` : null, "GET");
 
   const {
-    data: tasksData,
+    data: tasksPage,
     loading: tasksLoading,
     error: tasksError,
     refetch: refetchTasks,
+    makeRequest,
   } = useApi(
     id ? `${API_BASE_URL}/api/project/${id}/tasks/?${queryString}` : null,
     "GET",
     null,
     [queryString, id]
   );
+  const {
+    items: tasksData,
+    hasMore,
+    loadMore,
+    loadingMore,
+  } = useLoadMore(tasksPage, makeRequest);
+
+  const handleLoadMore = () =>
+    loadMore().catch(() => toast.error("Failed to load more tasks."));
 
   const handleFilterChange = (name, value) => {
     setFilters((prev) => ({ ...prev, [name]: value }));
@@ -200,6 +213,19 @@ const ProjectTasksPage = () => {
             ))}
           </div>
         )}
+
+        {!tasksLoading && !tasksError && hasMore && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50 flex items-center gap-2"
+            >
+              {loadingMore && <ClipLoader color="#3B82F6" size={16} />}
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
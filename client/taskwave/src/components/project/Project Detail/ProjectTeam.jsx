@@ -70,7 +70,7 @@ const ProjectTeam = ({ projectId, creatorId, currentUserId }) => {
     setChangeRoleModal({ isOpen: false, member: null });
   };
 
-  const membersList = membersData || [];
+  const membersList = membersData?.results || [];
 
   const sortedMembersList = [...membersList].sort((a, b) => {
     if (a.user.id === creatorId) return -1;
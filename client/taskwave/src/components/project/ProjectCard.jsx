@@ -10,9 +10,9 @@ const ProjectCard = ({ project }) => {
     title,
     description,
     creator,
-    members = [],
-    tasks = [],
-    assets = [],
+    member_count = 0,
+    task_counts = {},
+    asset_count = 0,
     created_at,
     updated_at,
   } = project;
@@ -59,21 +59,21 @@ const ProjectCard = ({ project }) => {
         <div className="flex items-center gap-1">
           <HiOutlineUserGroup className="w-5 h-5 text-gray-400" />
           <span className="text-xs font-medium text-gray-600">
-            {members.length} member{members.length !== 1 ? "s" : ""}
+            {member_count} member{member_count !== 1 ? "s" : ""}
           </span>
         </div>
 
         <div className="flex items-center gap-1">
           <BsListTask className="w-5 h-5 text-gray-400" />
           <span className="text-xs font-medium text-gray-600">
-            {tasks.length} task{tasks.length !== 1 ? "s" : ""}
+            {task_counts.total ?? 0} task{task_counts.total !== 1 ? "s" : ""}
           </span>
         </div>
 
         <div className="flex items-center gap-1">
           <AiOutlinePaperClip className="w-5 h-5 text-gray-400" />
           <span className="text-xs font-medium text-gray-600">
-            {assets.length} asset{assets.length !== 1 ? "s" : ""}
+            {asset_count} asset{asset_count !== 1 ? "s" : ""}
           </span>
         </div>
       </div>
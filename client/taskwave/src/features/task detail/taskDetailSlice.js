@@ -19,6 +19,7 @@ export const fetchTaskDetail = createAsyncThunk(
     try {
       const response = await axios.get(`${API_BASE_URL}/api/tasks/${taskId}/`, {
         headers: getAuthHeaders(),
+        params: { expand: "subtasks,assignees,project" },
       });
       return response.data;
     } catch (err) {
@@ -0,0 +1,28 @@
+import { useState, useEffect, useCallback } from "react";
+
+// Accumulates the results of a cursor-paginated list, starting from the
+// first page and following its `next` links on demand.
+export function useLoadMore(firstPage, makeRequest) {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  useEffect(() => {
+    setItems(firstPage?.results ?? []);
+    setNext(firstPage?.next ?? null);
+  }, [firstPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!next || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await makeRequest(next, "GET");
+      setItems((prev) => [...prev, ...page.results]);
+      setNext(page.next);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [next, loadingMore, makeRequest]);
+
+  return { items, hasMore: Boolean(next), loadMore, loadingMore };
+}
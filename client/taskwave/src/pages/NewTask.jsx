@@ -51,11 +51,20 @@ const NewTask = () => {
     [formData.project]
   );
 
+  const { data: projectMembersPage } = useApi(
+    formData.project
+      ? `${API_BASE_URL}/api/project/${formData.project}/members/?page_size=200`
+      : null,
+    "GET",
+    null,
+    [formData.project]
+  );
+
   const selectedProjectId = formData.project;
 
   const projectMembers = useMemo(() => {
-    return projectData?.members?.map((member) => member.user) || [];
-  }, [projectData]);
+    return projectMembersPage?.results?.map((member) => member.user) || [];
+  }, [projectMembersPage]);
 
   useEffect(() => {
     if (!selectedProjectId) {
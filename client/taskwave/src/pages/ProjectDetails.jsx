@@ -46,6 +46,13 @@ const ProjectDetails = () => {
     }
   }, [projectData]);
 
+  // The detail payload only carries task counts; show the first few tasks.
+  const { data: tasksPage } = useApi(
+    id ? `${API_BASE_URL}/api/project/${id}/tasks/?page_size=5` : null,
+    "GET"
+  );
+  const tasks = tasksPage?.results || [];
+
   const getStatusColor = (status) => {
     switch (status?.toLowerCase()) {
       case "completed":
@@ -176,8 +183,8 @@ const ProjectDetails = () => {
     title,
     description,
     creator,
-    members = [],
-    tasks = [],
+    member_count = 0,
+    task_counts = {},
     assets = [],
     created_at,
     updated_at,
@@ -186,11 +193,10 @@ const ProjectDetails = () => {
     due_date,
   } = project;
 
-  const completedTasks = tasks.filter(
-    (task) => task.status?.toLowerCase() === "completed"
-  ).length;
+  const totalTasks = task_counts.total || 0;
+  const completedTasks = task_counts.completed || 0;
   const progressPercentage =
-    tasks.length > 0 ? Math.round((completedTasks / tasks.length) * 100) : 0;
+    totalTasks > 0 ? Math.round((completedTasks / totalTasks) * 100) : 0;
 
   return (
     <div className="min-h-screen bg-gray-50">
@@ -264,7 +270,7 @@ const ProjectDetails = () => {
             </div>
 
             {/* Progress Section */}
-            {tasks.length > 0 && (
+            {totalTasks > 0 && (
               <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6">
                 <h2 className="text-lg font-semibold text-gray-900 mb-4 flex items-center gap-2">
                   <FaChartLine className="w-5 h-5" />
@@ -276,7 +282,7 @@ const ProjectDetails = () => {
                       Task Completion
                     </span>
                     <span className="text-sm font-bold text-gray-900">
-                      {completedTasks}/{tasks.length} ({progressPercentage}%)
+                      {completedTasks}/{totalTasks} ({progressPercentage}%)
                     </span>
                   </div>
                   <div className="w-full bg-gray-200 rounded-full h-3">
@@ -297,7 +303,7 @@ const ProjectDetails = () => {
             />
 
             {/* Tasks */}
-            <ProjectTasks projectId={id} tasks={tasks} />
+            <ProjectTasks projectId={id} tasks={tasks} total={totalTasks} />
           </div>
 
           {/* Sidebar */}
@@ -314,7 +320,7 @@ const ProjectDetails = () => {
                     <span className="text-sm">Tasks</span>
                   </div>
                   <span className="font-semibold text-gray-900">
-                    {tasks.length}
+                    {totalTasks}
                   </span>
                 </div>
 
@@ -324,7 +330,7 @@ const ProjectDetails = () => {
                     <span className="text-sm">Members</span>
                   </div>
                   <span className="font-semibold text-gray-900">
-                    {members.length}
+                    {member_count}
                   </span>
                 </div>
 
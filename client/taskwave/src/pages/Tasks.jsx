@@ -1,5 +1,6 @@
 import React, { useState, useMemo } from "react";
 import { useApi } from "../hooks/useApi";
+import { useLoadMore } from "../hooks/useLoadMore";
 import { Link } from "react-router-dom";
 import { FaPlus, FaExclamationCircle, FaClipboardList } from "react-icons/fa";
 import { ClipLoader } from "react-spinners";
@@ -28,18 +29,29 @@ const Tasks = () => {
     if (activeTab === "Assigned to me") query.append("assigned_to_me", true);
     if (activeTab === "Created by me") query.append("created_by_me", true);
     if (sortBy) query.append("ordering", sortBy);
+    query.append("expand", "assignees,assets");
     return query.toString();
   };
 
   const queryString = useMemo(() => buildQuery(), [activeTab, filters, sortBy]);
 
   const {
-    data: tasks = [],
+    data,
     loading,
     error,
+    makeRequest,
   } = useApi(`${API_BASE_URL}/api/tasks/?${queryString}`, "GET", null, [
     queryString,
   ]);
+  const {
+    items: tasks,
+    hasMore,
+    loadMore,
+    loadingMore,
+  } = useLoadMore(data, makeRequest);
+
+  const handleLoadMore = () =>
+    loadMore().catch(() => toast.error("Failed to load more tasks."));
 
   const onTabChange = (tab) => setActiveTab(tab);
   const onFilterChange = (name, value) =>
@@ -53,7 +65,10 @@ const Tasks = () => {
           <h1 className="text-3xl font-bold text-gray-900">
             Tasks{" "}
             {!loading && (
-              <span className="text-gray-400">({tasks.length})</span>
+              <span className="text-gray-400">
+                ({tasks.length}
+                {hasMore && "+"})
+              </span>
             )}
           </h1>
           <Link to="/new-task/">
@@ -114,6 +129,19 @@ const Tasks = () => {
             ))}
           </div>
         )}
+
+        {!loading && !error && hasMore && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition-colors disabled:opacity-50 flex items-center gap-2"
+            >
+              {loadingMore && <ClipLoader color="#2563EB" size={16} />}
+              Load more
+            </button>
+          </div>
+        )}
       </div>
 
       <ToastContainer
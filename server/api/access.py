@@ -0,0 +1,70 @@
+import uuid
+from django.utils.functional import cached_property
+from .models import Project, Membership
+
+
+def as_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class ProjectAccess:
+    """
+    Identity map of one user's memberships and of the creators of the
+    projects asked about. Memberships are loaded with a single query on first
+    use and creators once per project, so repeated permission checks within a
+    request do not hit the database again.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.creator_ids = {}
+
+    @cached_property
+    def memberships(self):
+        return {
+            membership.project_id: membership
+            for membership in Membership.objects.filter(
+                user_id=self.user.pk).select_related('role')
+        }
+
+    def load_creators(self, project_ids):
+        missing = {as_uuid(pk) for pk in project_ids} - self.creator_ids.keys() - {None}
+        if missing:
+            self.creator_ids.update(dict.fromkeys(missing))
+            self.creator_ids.update(Project.objects.filter(
+                pk__in=missing).values_list('id', 'creator_id'))
+
+    def membership(self, project_id):
+        return self.memberships.get(as_uuid(project_id))
+
+    def is_member(self, project_id):
+        return self.membership(project_id) is not None
+
+    def is_creator(self, project):
+        if isinstance(project, Project):
+            return project.creator_id == self.user.pk
+        project_id = as_uuid(project)
+        self.load_creators([project_id])
+        return project_id is not None and self.creator_ids[project_id] == self.user.pk
+
+    def can_access(self, project):
+        project_id = project.pk if isinstance(project, Project) else project
+        return self.is_member(project_id) or self.is_creator(project)
+
+
+def get_project_access(request):
+    """
+    Returns the ProjectAccess for `request.user`, shared by every view,
+    serializer and permission handling the same request.
+    """
+    user = request.user
+    request = getattr(request, '_request', request)
+    access = getattr(request, '_project_access', None)
+    if access is None or access.user.pk != user.pk:
+        access = request._project_access = ProjectAccess(user)
+    return access
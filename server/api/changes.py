@@ -0,0 +1,34 @@
+from .models import Change, Project, Task, Asset, Membership
+
+Action = Change.ActionChoices
+
+
+def scope(instance):
+    if isinstance(instance, Project):
+        return {'project_id': instance.pk}
+    if isinstance(instance, Task):
+        return {'task_id': instance.pk, 'project_id': instance.project_id}
+    if isinstance(instance, Asset):
+        return {'task_id': instance.task_id, 'project_id': instance.project_id}
+    if isinstance(instance, Membership):
+        return {'project_id': instance.project_id}
+    return {'task_id': instance.task_id}
+
+
+def change_row(instance, action=Action.UPSERT, user_id=None, **fields):
+    return Change(
+        kind=instance._meta.model_name,
+        object_id=instance.pk,
+        action=action,
+        user_id=user_id,
+        **{**scope(instance), **fields},
+    )
+
+
+def addressed(instance, action, user_ids, **fields):
+    return [change_row(instance, action, user_id, **fields) for user_id in set(user_ids) if user_id]
+
+
+def record(changes):
+    if changes:
+        Change.objects.bulk_create(changes, batch_size=500)
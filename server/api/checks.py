@@ -0,0 +1,16 @@
+from django.core.checks import Warning, register
+from django.db import connection
+
+
+@register()
+def check_change_log_writers(app_configs, **kwargs):
+    # Change.seq is assigned at insert; delta sync assumes it commits in order.
+    if connection.vendor == 'sqlite':
+        return []
+    return [Warning(
+        'The change log assumes a single writer, which only SQLite guarantees.',
+        hint='With concurrent writers, a change can commit below a `since` a '
+             'client has already read past and never reach that client.',
+        obj='api.Change',
+        id='api.W001',
+    )]
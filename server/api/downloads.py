@@ -0,0 +1,137 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+from .storage import BLOCK_SIZE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def byte_range(header, size):
+    """
+    Returns the inclusive (start, end) of a single `bytes=` range. Multiple or
+    malformed ranges return None, and the whole file is sent instead.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - int(last), 0), size - 1
+    start, end = int(first), int(last) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def file_etag(name, stat):
+    # Content-addressed blobs are named by their SHA-256.
+    digest = os.path.basename(name)
+    if DIGEST_RE.match(digest):
+        return quote_etag(digest)
+    return quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def sendfile_response(path, name):
+    """
+    Hands the transfer to the front proxy when ASSET_SENDFILE is set:
+    'x-accel-redirect' for nginx, with ASSET_ACCEL_REDIRECT_PREFIX as the
+    internal location mapped to MEDIA_ROOT, or 'x-sendfile' for Apache and
+    lighttpd. The proxy then handles Range requests itself.
+    """
+    backend = getattr(settings, 'ASSET_SENDFILE', '').lower()
+    if backend == 'x-accel-redirect':
+        response = HttpResponse()
+        prefix = getattr(settings, 'ASSET_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        return response
+    if backend == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+def serve(request, asset):
+    """
+    Response for downloading `asset`, honouring If-None-Match,
+    If-Modified-Since, Range and If-Range. The file is never read into
+    memory: it is sent by the proxy or streamed in blocks.
+    """
+    name = asset.file.name
+    try:
+        path = asset.file.path
+        stat = os.stat(path)
+    except (ValueError, FileNotFoundError):
+        raise Http404('File not found.')
+
+    size = stat.st_size
+    etag = file_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    filename = asset.filename or os.path.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    response = sendfile_response(path, name)
+    if response is None:
+        span = None
+        if request.headers.get('Range') and if_range_matches(request, etag, last_modified):
+            try:
+                span = byte_range(request.headers['Range'], size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        if span is None:
+            response = FileResponse(open(path, 'rb'))
+            response.block_size = BLOCK_SIZE
+        else:
+            start, end = span
+            response = StreamingHttpResponse(read_range(path, start, end - start + 1), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+
+    response['Content-Type'] = content_type
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,8 +1,20 @@
 import django_filters
-from .models import Task, Project
+from django.db.models import Q
+from .models import Task, Project, Membership
 from django.utils.timezone import now
 
 
+def task_facets(user):
+    today = now().date()
+    return {
+        'assigned_to_me': Q(id__in=Task.assignees.through.objects.filter(
+            user=user).values('task_id')),
+        'created_by_me': Q(creator=user),
+        'due_today': Q(due_date=today),
+        'overdue': Q(due_date__lt=today) & ~Q(status__iexact="Completed"),
+    }
+
+
 class TaskFilter(django_filters.FilterSet):
     priority = django_filters.CharFilter(field_name='priority', lookup_expr='iexact')
     status = django_filters.CharFilter(field_name='status', lookup_expr='iexact')
@@ -19,7 +31,7 @@ class TaskFilter(django_filters.FilterSet):
 
     def filter_assigned_to_me(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
-            return queryset.filter(assignees=self.request.user)
+            return queryset.filter(task_facets(self.request.user)['assigned_to_me'])
         return queryset
 
     def filter_created_by_me(self, queryset, name, value):
@@ -33,14 +45,12 @@ class TaskFilter(django_filters.FilterSet):
 
     def filter_due_today(self, queryset, name, value):
         if value:
-            today = now().date()
-            return queryset.filter(due_date=today)
+            return queryset.filter(task_facets(self.request.user)['due_today'])
         return queryset
 
     def filter_overdue(self, queryset, name, value):
         if value:
-            today = now().date()
-            return queryset.filter(due_date__lt=today).exclude(status__iexact="Completed")
+            return queryset.filter(task_facets(self.request.user)['overdue'])
         return queryset
 
 class ProjectFilter(django_filters.FilterSet):
@@ -58,4 +68,25 @@ class ProjectFilter(django_filters.FilterSet):
             return queryset.filter(creator=self.request.user)
         elif str(value).lower() == 'false':
             return queryset.exclude(creator=self.request.user)
-        return queryset
\ No newline at end of file
+        return queryset
+
+
+class MembershipFilter(django_filters.FilterSet):
+    role = django_filters.ChoiceFilter(
+        field_name='role__name', choices=Membership.RoleChoices.choices)
+    search = django_filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = Membership
+        fields = ['role']
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return queryset.filter(
+            Q(user__username__istartswith=value) |
+            Q(user__first_name__istartswith=value) |
+            Q(user__last_name__istartswith=value) |
+            Q(user__email__istartswith=value)
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api import uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes resumable asset uploads left idle past their expiry, with their partial files.'
+
+    def handle(self, *args, **options):
+        count = uploads.expire()
+        self.stdout.write(f'Expired {count} upload(s).')
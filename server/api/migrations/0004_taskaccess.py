@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_task_access(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    TaskAccess = apps.get_model('api', 'TaskAccess')
+    Membership = apps.get_model('api', 'Membership')
+
+    rows = [
+        TaskAccess(user_id=creator_id, task_id=task_id, reason='Creator')
+        for task_id, creator_id in Task.objects.values_list('id', 'creator_id')
+    ]
+    rows += [
+        TaskAccess(user_id=user_id, task_id=task_id, reason='Assignee')
+        for task_id, user_id in Task.assignees.through.objects.values_list('task_id', 'user_id')
+    ]
+    members = {}
+    for project_id, user_id in Membership.objects.values_list('project_id', 'user_id'):
+        members.setdefault(project_id, set()).add(user_id)
+    for task_id, project_id in Task.objects.filter(project__isnull=False).values_list('id', 'project_id'):
+        rows += [
+            TaskAccess(user_id=user_id, task_id=task_id, reason='Member')
+            for user_id in members.get(project_id, ())
+        ]
+    TaskAccess.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_remove_asset_asset_belongs_to_either_task_or_project'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('Creator', 'Creator'), ('Assignee', 'Assignee'), ('Member', 'Member')], max_length=10)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='api.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'task', 'reason'), name='unique_task_access')],
+            },
+        ),
+        migrations.RunPython(backfill_task_access, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_taskaccess'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-due_date', 'priority', 'id'], name='task_keyset_idx'),
+        ),
+    ]
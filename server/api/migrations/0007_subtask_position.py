@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_subtask_position(apps, schema_editor):
+    Subtask = apps.get_model('api', 'Subtask')
+    subtasks, positions = [], {}
+    for subtask in Subtask.objects.order_by('task_id', 'created_at').only('id', 'task_id'):
+        subtask.position = positions.get(subtask.task_id, 0)
+        positions[subtask.task_id] = subtask.position + 1
+        subtasks.append(subtask)
+    Subtask.objects.bulk_update(subtasks, ['position'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_comment_thread_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['task', 'position'], name='subtask_order_idx'),
+        ),
+        migrations.RunPython(backfill_subtask_position, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_memberships(apps, schema_editor):
+    Membership = apps.get_model('api', 'Membership')
+    seen, duplicates = set(), []
+    for pk, user_id, project_id in Membership.objects.order_by(
+            'joined_at').values_list('id', 'user_id', 'project_id'):
+        if (user_id, project_id) in seen:
+            duplicates.append(pk)
+        seen.add((user_id, project_id))
+    Membership.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_subtask_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_memberships, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='unique_project_membership'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE api_search_fts USING fts5(
+        title, body,
+        content='api_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER api_searchentry_ai AFTER INSERT ON api_searchentry BEGIN
+        INSERT INTO api_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER api_searchentry_ad AFTER DELETE ON api_searchentry BEGIN
+        INSERT INTO api_search_fts(api_search_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER api_searchentry_au AFTER UPDATE ON api_searchentry BEGIN
+        INSERT INTO api_search_fts(api_search_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO api_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+DROP_FTS_SQL = [
+    'DROP TRIGGER IF EXISTS api_searchentry_ai',
+    'DROP TRIGGER IF EXISTS api_searchentry_ad',
+    'DROP TRIGGER IF EXISTS api_searchentry_au',
+    'DROP TABLE IF EXISTS api_search_fts',
+]
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in FTS_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_FTS_SQL:
+            schema_editor.execute(statement)
+
+
+def backfill_search_index(apps, schema_editor):
+    SearchEntry = apps.get_model('api', 'SearchEntry')
+    Task = apps.get_model('api', 'Task')
+    Comment = apps.get_model('api', 'Comment')
+    Project = apps.get_model('api', 'Project')
+
+    entries = [
+        SearchEntry(kind='task', object_id=pk, task_id=pk, title=title, body=description or '')
+        for pk, title, description in Task.objects.values_list('id', 'title', 'description').iterator()
+    ]
+    entries += [
+        SearchEntry(kind='comment', object_id=pk, task_id=task_id, body=text)
+        for pk, task_id, text in Comment.objects.values_list('id', 'task_id', 'text').iterator()
+    ]
+    entries += [
+        SearchEntry(kind='project', object_id=pk, project_id=pk, title=title, body=description or '')
+        for pk, title, description in Project.objects.values_list('id', 'title', 'description').iterator()
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_unique_project_membership'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('task', 'Task'), ('comment', 'Comment'), ('project', 'Project')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.project')),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.task')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
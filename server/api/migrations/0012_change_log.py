@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_object_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('task', 'Task'), ('subtask', 'Subtask'), ('comment', 'Comment'), ('asset', 'Asset'), ('membership', 'Membership')], max_length=10)),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete'), ('revoke', 'Revoke')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('task_id', models.UUIDField(blank=True, null=True)),
+                ('project_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'kind', 'action'], name='change_recipient_idx')],
+            },
+        ),
+    ]
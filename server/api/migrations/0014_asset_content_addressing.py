@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 19:44
+
+import os
+import api.storage
+import api.validators
+from django.db import migrations, models
+
+
+def backfill_asset_filename(apps, schema_editor):
+    Asset = apps.get_model('api', 'Asset')
+    assets = list(Asset.objects.only('id', 'file'))
+    for asset in assets:
+        asset.filename = os.path.basename(asset.file.name)
+    Asset.objects.bulk_update(assets, ['filename'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_asset_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='file',
+            field=models.FileField(db_index=True, storage=api.storage.ContentAddressedStorage(), upload_to='assets/', validators=[api.validators.validate_file_size]),
+        ),
+        migrations.RunPython(backfill_asset_filename, migrations.RunPython.noop),
+    ]
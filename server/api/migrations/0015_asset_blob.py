@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_asset_content_addressing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('claimed_at', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
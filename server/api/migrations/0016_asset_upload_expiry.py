@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:26
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_asset_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assetupload',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, default=api.models.upload_expiry),
+        ),
+    ]
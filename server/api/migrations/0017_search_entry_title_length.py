@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 20:47
+
+from importlib import import_module
+from django.db import migrations, models
+
+search_index = import_module('api.migrations.0009_search_index')
+
+
+# SQLite alters a column by rebuilding the table, which drops the triggers
+# that keep the FTS index in sync, so the index is recreated around it.
+def recreate_fts_index(apps, schema_editor):
+    search_index.create_fts_index(apps, schema_editor)
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("INSERT INTO api_search_fts(api_search_fts) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_asset_upload_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(search_index.drop_fts_index, recreate_fts_index),
+        migrations.AlterField(
+            model_name='searchentry',
+            name='title',
+            field=models.CharField(blank=True, max_length=300),
+        ),
+        migrations.RunPython(recreate_fts_index, search_index.drop_fts_index),
+    ]
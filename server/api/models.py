@@ -1,10 +1,99 @@
-from django.db import models
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.core.validators import MaxValueValidator
 from users.models import User
-from .validators import validate_due_date, validate_file_size
+from .storage import asset_storage
+from .validators import validate_due_date, validate_file_size, MAX_FILE_SIZE
+import os
 import uuid
 
 
-class Project(models.Model):
+def count_subquery(model, **filters):
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(project=models.OuterRef('pk'), **filters)
+            .order_by()
+            .values('project')
+            .annotate(count=models.Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+
+
+def member_preview_prefetch(size=5):
+    return models.Prefetch(
+        'memberships',
+        queryset=Membership.objects.select_related('user', 'role').order_by('joined_at', 'id')[:size],
+        to_attr='member_preview',
+    )
+
+
+class LoggedModel(models.Model):
+    """
+    A model whose saves are recorded in the change log. The save and its
+    post_save receivers (change rows, search entries, versions) run in one
+    transaction, so a failed log write cannot leave the row saved unlogged.
+    Deletes and m2m changes already run their receivers in a transaction.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class VersionedModel(LoggedModel):
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = models.F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(
+            models.Q(creator=user) |
+            models.Q(id__in=Membership.objects.filter(user=user).values('project_id'))
+        )
+
+    def with_summary(self):
+        today = timezone.now().date()
+        status = Task.StatusChoices
+        return self.annotate(
+            task_total=models.Count('tasks'),
+            task_pending=models.Count(
+                'tasks', filter=models.Q(tasks__status=status.PENDING)),
+            task_in_progress=models.Count(
+                'tasks', filter=models.Q(tasks__status=status.IN_PROGRESS)),
+            task_completed=models.Count(
+                'tasks', filter=models.Q(tasks__status=status.COMPLETED)),
+            overdue_count=models.Count(
+                'tasks',
+                filter=models.Q(tasks__due_date__lt=today) &
+                ~models.Q(tasks__status=status.COMPLETED),
+            ),
+            member_count=count_subquery(Membership),
+            asset_count=count_subquery(Asset),
+        )
+
+    def with_member_preview(self):
+        return self.prefetch_related(member_preview_prefetch())
+
+
+class Project(VersionedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     creator = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='created_projects')
@@ -15,8 +104,7 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def is_member(self, user):
-        return self.members.filter(id=user.id).exists()
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self):
         return f"Project {self.title} by {self.creator}"
@@ -30,7 +118,7 @@ class Role(models.Model):
         return self.name
 
 
-class Membership(models.Model):
+class Membership(LoggedModel):
     class RoleChoices(models.TextChoices):
         MANAGEMENT = 'Management', 'Management'
         MEMBER = 'Member', 'Member'
@@ -45,11 +133,45 @@ class Membership(models.Model):
         Role, on_delete=models.CASCADE, related_name='memberships')
     joined_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'project'], name='unique_project_membership'),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'user'], name='membership_project_user_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_pair = (
+            instance.__dict__.get('user_id'), instance.__dict__.get('project_id'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Task access, caches and the change log are keyed by the
+        # (user, project) pair, so a membership is deleted and recreated
+        # rather than moved. Deferred fields were not loaded and are None.
+        stored = getattr(self, '_stored_pair', (None, None))
+        if not self._state.adding and any(
+                old is not None and old != new
+                for old, new in zip(stored, (self.user_id, self.project_id))):
+            raise ValueError('The user and project of a membership cannot be changed.')
+        super().save(*args, **kwargs)
+        self._stored_pair = (self.user_id, self.project_id)
+
     def __str__(self):
         return f"{self.user.username} is {self.role} in {self.project.title}"
 
 
-class Task(models.Model):
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(
+            id__in=TaskAccess.objects.filter(user=user).values('task_id'))
+
+
+class Task(VersionedModel):
     class PriorityChoices(models.TextChoices):
         LOW = 'Low', 'Low'
         MEDIUM = 'Medium', 'Medium'
@@ -79,12 +201,16 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-due_date', 'priority']
         indexes = [
             models.Index(fields=['due_date']),
             models.Index(fields=['priority']),
             models.Index(fields=['status']),
+            models.Index(fields=['-due_date', 'priority', 'id'],
+                         name='task_keyset_idx'),
         ]
 
     def __str__(self):
@@ -93,10 +219,91 @@ class Task(models.Model):
         return f"{self.title} (Independent)"
 
 
-class Asset(models.Model):
+class TaskAccessManager(models.Manager):
+    def sync_task(self, task):
+        self.sync_tasks([task])
+
+    def sync_tasks(self, tasks):
+        reasons = TaskAccess.ReasonChoices
+        task_ids = [task.pk for task in tasks]
+        wanted = {(task.creator_id, task.pk, reasons.CREATOR) for task in tasks}
+        wanted.update(
+            (user_id, task_id, reasons.ASSIGNEE)
+            for task_id, user_id in Task.assignees.through.objects.filter(
+                task_id__in=task_ids).values_list('task_id', 'user_id')
+        )
+        project_tasks = {}
+        for task in tasks:
+            if task.project_id:
+                project_tasks.setdefault(task.project_id, []).append(task.pk)
+        if project_tasks:
+            for project_id, user_id in Membership.objects.filter(
+                    project_id__in=project_tasks).values_list('project_id', 'user_id'):
+                wanted.update(
+                    (user_id, task_id, reasons.MEMBER)
+                    for task_id in project_tasks[project_id]
+                )
+
+        existing = {
+            (row['user_id'], row['task_id'], row['reason']): row['id']
+            for row in self.filter(task_id__in=task_ids).values(
+                'id', 'user_id', 'task_id', 'reason')
+        }
+        stale = [pk for key, pk in existing.items() if key not in wanted]
+        if stale:
+            self.filter(id__in=stale).delete()
+        self.bulk_create(
+            [
+                TaskAccess(user_id=user_id, task_id=task_id, reason=reason)
+                for user_id, task_id, reason in wanted - existing.keys()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    def grant(self, reason, user_ids, task_ids):
+        self.bulk_create(
+            [
+                TaskAccess(user_id=user_id, task_id=task_id, reason=reason)
+                for user_id in user_ids
+                for task_id in task_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+    def revoke(self, reason, user_ids, task_ids):
+        self.filter(
+            reason=reason, user_id__in=user_ids, task_id__in=task_ids).delete()
+
+
+class TaskAccess(models.Model):
+    class ReasonChoices(models.TextChoices):
+        CREATOR = 'Creator', 'Creator'
+        ASSIGNEE = 'Assignee', 'Assignee'
+        MEMBER = 'Member', 'Member'
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_access')
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='access')
+    reason = models.CharField(max_length=10, choices=ReasonChoices.choices)
+
+    objects = TaskAccessManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'task', 'reason'], name='unique_task_access'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} can see {self.task_id} ({self.reason})"
+
+
+class Asset(LoggedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    file = models.FileField(upload_to='assets/',
+    file = models.FileField(upload_to='assets/', storage=asset_storage, db_index=True,
                             validators=[validate_file_size])
+    filename = models.CharField(max_length=255, blank=True)
     task = models.ForeignKey(
         Task, on_delete=models.CASCADE, null=True, blank=True, related_name='assets')
     project = models.ForeignKey(
@@ -105,13 +312,87 @@ class Asset(models.Model):
         User, on_delete=models.CASCADE, related_name='uploaded_assets')
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
-    def delete(self, *args, **kwargs):
-        if self.file:
-            self.file.delete(save=False)
-        super().delete(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        # Stored names are content digests, so keep the name it was uploaded as.
+        # The blob storage claims (AssetBlob.claim) is held until this row is
+        # committed, as LoggedModel saves in a transaction.
+        if self.file and not self.file._committed:
+            self.filename = os.path.basename(self.file.name)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def release_files(cls, *names):
+        """
+        Deletes the stored files among `names` that no Asset refers to any
+        more, once the current transaction commits.
+        """
+        names = {name for name in names if name}
+
+        def delete():
+            for name in names:
+                # Re-check under the blob's claim, so an asset reusing the
+                # blob either commits first or waits until it is gone.
+                with transaction.atomic():
+                    AssetBlob.claim(name)
+                    if not cls.objects.filter(file=name).exists():
+                        asset_storage.delete(name)
+                        AssetBlob.objects.filter(name=name).delete()
 
+        if names:
+            transaction.on_commit(delete, robust=True)
 
-class Subtask(models.Model):
+
+class AssetBlob(models.Model):
+    """
+    A stored asset file. Its row is claimed, which locks it until the
+    transaction ends, both when an asset is about to refer to the file and
+    when the file is released, so the two are never interleaved.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    claimed_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def claim(cls, name):
+        # An UPDATE locks the row on every backend (on SQLite, the database).
+        # Retry if a concurrent release deleted it after the insert.
+        while not cls.objects.filter(name=name).update(claimed_at=timezone.now()):
+            cls.objects.bulk_create([cls(name=name)], ignore_conflicts=True)
+
+
+def upload_expiry():
+    return timezone.now() + timedelta(seconds=getattr(settings, 'ASSET_UPLOAD_EXPIRY', 24 * 60 * 60))
+
+
+class AssetUpload(models.Model):
+    """
+    An asset being uploaded in chunks. Received bytes live in a temporary
+    file (see api/uploads.py) until the upload is finalized into an Asset.
+    Each chunk pushes `expires_at` back; uploads left idle past it are
+    deleted, together with their file, by uploads.expire().
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(validators=[MaxValueValidator(MAX_FILE_SIZE)])
+    offset = models.PositiveBigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True)
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    uploaded_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='asset_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(default=upload_expiry, db_index=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class Subtask(LoggedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     task = models.ForeignKey(
         Task, on_delete=models.CASCADE, related_name='subtasks')
@@ -119,14 +400,20 @@ class Subtask(models.Model):
     assigned_to = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, related_name='subtasks_assigned')
     is_completed = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'position'], name='subtask_order_idx'),
+        ]
+
     def __str__(self):
         return f"Subtask {self.title} for {self.task.title}"
 
 
-class Comment(models.Model):
+class Comment(LoggedModel):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     task = models.ForeignKey(
         Task, on_delete=models.CASCADE, related_name='comments')
@@ -141,6 +428,108 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task', 'parent', '-created_at'],
+                         name='comment_thread_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.task.title}"
+
+
+class SearchEntryQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(
+            models.Q(task__in=TaskAccess.objects.filter(user=user).values('task_id')) |
+            models.Q(project__in=Project.objects.visible_to(user).values('id'))
+        )
+
+
+class SearchEntry(models.Model):
+    class KindChoices(models.TextChoices):
+        TASK = 'task', 'Task'
+        COMMENT = 'comment', 'Comment'
+        PROJECT = 'project', 'Project'
+
+    kind = models.CharField(max_length=10, choices=KindChoices.choices)
+    object_id = models.UUIDField()
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    title = models.CharField(max_length=300, blank=True)
+    body = models.TextField(blank=True)
+
+    objects = SearchEntryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'], name='unique_search_entry'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class ChangeQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        # Rows scoped to a deleted task or project stay visible to the users
+        # that received that object's tombstone. Ids are never reused, so this
+        # cannot expose later changes.
+        deleted = self.filter(user=user, action=Change.ActionChoices.DELETE)
+        in_scope = (
+            models.Q(task_id__in=TaskAccess.objects.filter(user=user).values('task_id')) |
+            models.Q(project_id__in=Project.objects.visible_to(user).values('id')) |
+            models.Q(task_id__in=deleted.filter(
+                kind=Change.KindChoices.TASK).values('object_id')) |
+            models.Q(project_id__in=deleted.filter(
+                kind=Change.KindChoices.PROJECT).values('object_id'))
+        )
+        return self.filter(models.Q(user=user) | models.Q(user__isnull=True) & in_scope)
+
+
+class Change(models.Model):
+    """
+    Append-only log of upserts and deletes. Rows without a user are visible
+    to anyone who can see their task or project; rows with a user (tombstones
+    of deleted tasks and projects, revoked access) are addressed to that user
+    only.
+
+    `seq` is assigned at insert, and readers page by it, so the log relies on
+    transactions committing in seq order. SQLite's single writer guarantees
+    that; on a backend with concurrent writers a lower seq could commit after
+    a higher one had been read past (see the api.W001 check).
+    """
+    class KindChoices(models.TextChoices):
+        PROJECT = 'project', 'Project'
+        TASK = 'task', 'Task'
+        SUBTASK = 'subtask', 'Subtask'
+        COMMENT = 'comment', 'Comment'
+        ASSET = 'asset', 'Asset'
+        MEMBERSHIP = 'membership', 'Membership'
+
+    class ActionChoices(models.TextChoices):
+        UPSERT = 'upsert', 'Upsert'
+        DELETE = 'delete', 'Delete'
+        REVOKE = 'revoke', 'Revoke'
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KindChoices.choices)
+    action = models.CharField(max_length=10, choices=ActionChoices.choices)
+    object_id = models.UUIDField()
+    task_id = models.UUIDField(null=True, blank=True)
+    project_id = models.UUIDField(null=True, blank=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ChangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'kind', 'action'], name='change_recipient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.seq} {self.action} {self.kind} {self.object_id}"
@@ -0,0 +1,189 @@
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite ordering. Each entry of `ordering` is
+    (field, descending, nullable); nulls always sort last. The last field must
+    be unique so pages never overlap.
+    """
+    ordering = ()
+    page_size = 50
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        page_size = self.page_size
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def order_by(self, reverse=False):
+        expressions = []
+        for field, descending, nullable in self.ordering:
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            if not nullable:
+                nulls = {}
+            if descending != reverse:
+                expressions.append(F(field).desc(**nulls))
+            else:
+                expressions.append(F(field).asc(**nulls))
+        return expressions
+
+    def _after(self, field, value, descending, nullable):
+        if value is None:
+            return Q(pk__in=[])
+        condition = Q(**{f'{field}__lt' if descending else f'{field}__gt': value})
+        if nullable:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+    def _before(self, field, value, descending, nullable):
+        if value is None:
+            return Q(**{f'{field}__isnull': False})
+        return Q(**{f'{field}__gt' if descending else f'{field}__lt': value})
+
+    def keyset_filter(self, position, reverse=False):
+        compare = self._before if reverse else self._after
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (field, descending, nullable), value in zip(self.ordering, position):
+            condition |= prefix & compare(field, value, descending, nullable)
+            if value is None:
+                prefix &= Q(**{f'{field}__isnull': True})
+            else:
+                prefix &= Q(**{field: value})
+        return condition
+
+    def dump_position(self, values):
+        position = []
+        for value in values:
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif value is not None:
+                value = str(value)
+            position.append(value)
+        return position
+
+    def get_position(self, instance):
+        return self.dump_position(getattr(instance, field) for field, _, _ in self.ordering)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def parse_position(self, model, position):
+        values = []
+        for (field, _, nullable), value in zip(self.ordering, position):
+            if value is None:
+                if not nullable:
+                    raise ValueError(field)
+                values.append(None)
+            elif isinstance(value, str):
+                values.append(model._meta.get_field(field).to_python(value))
+            else:
+                raise ValueError(field)
+        return values
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position, reverse = payload['p'], bool(payload['r'])
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError('position')
+            return self.parse_position(model, position), reverse
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request, queryset.model)
+        return self.get_page(queryset, self.get_page_size(request), position, reverse)
+
+    def get_page(self, queryset, page_size, position=None, reverse=False):
+        queryset = queryset.order_by(*self.order_by(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, reverse))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        if results:
+            first, last = self.get_position(results[0]), self.get_position(results[-1])
+        else:
+            first = last = position and self.dump_position(position)
+        self.next_url = self.encode_cursor(last, False) if has_next else None
+        self.previous_url = self.encode_cursor(first, True) if has_previous else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_url,
+            'previous': self.previous_url,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TaskCursorPagination(KeysetPagination):
+    ordering = (
+        ('due_date', True, True),
+        ('priority', False, False),
+        ('id', False, False),
+    )
+
+
+class CommentCursorPagination(KeysetPagination):
+    ordering = (
+        ('created_at', True, False),
+        ('id', True, False),
+    )
+
+
+class ReplyCursorPagination(KeysetPagination):
+    ordering = (
+        ('created_at', False, False),
+        ('id', False, False),
+    )
+
+
+class MembershipCursorPagination(KeysetPagination):
+    ordering = (
+        ('joined_at', False, False),
+        ('id', False, False),
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from .models import Task, TaskAccess
+
+
+def project_channel(project_id):
+    return f'project:{project_id}'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def change_event(instance, action, **fields):
+    return {'type': instance._meta.model_name, 'action': action, 'id': instance.pk, **fields}
+
+
+class Subscription:
+    """
+    One connection's queue of pending events. `deliver` may be called from any
+    thread; events are handed to the connection's event loop.
+    """
+    max_pending = 100
+
+    def __init__(self, loop=None):
+        self.channels = set()
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            pass
+
+    def put(self, event):
+        if self.queue.qsize() >= self.max_pending:
+            # A client this far behind has to refetch anyway.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {'type': 'resync'}
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+def revoked_project(event, user_id):
+    """
+    The project whose membership `event` takes away from `user_id`, if it is
+    such a deletion. Ids are compared as strings, as relayed events may have
+    been through JSON.
+    """
+    if (event.get('type') == 'membership' and event.get('action') == 'deleted'
+            and str(event.get('user')) == str(user_id)):
+        return event.get('project')
+    return None
+
+
+class InProcessBroker:
+    """
+    Fans events out to the subscriptions of this process. Deployments with
+    several workers set REALTIME_BROKER to a subclass whose `publish` relays
+    events between processes and calls `deliver` in each of them.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, subscription, channel):
+        with self.lock:
+            self.subscribers[channel].add(subscription)
+            subscription.channels.add(channel)
+
+    def unsubscribe(self, subscription, channel=None):
+        channels = [channel] if channel else list(subscription.channels)
+        with self.lock:
+            for name in channels:
+                subscribers = self.subscribers.get(name)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscribers[name]
+                subscription.channels.discard(name)
+
+    def publish(self, channels, event):
+        self.deliver(channels, event)
+
+    def deliver(self, channels, event):
+        with self.lock:
+            targets = set()
+            for name in channels:
+                targets.update(self.subscribers.get(name, ()))
+        for subscription in targets:
+            subscription.deliver(event)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(
+        getattr(settings, 'REALTIME_BROKER', 'api.realtime.InProcessBroker'))()
+
+
+def task_audience(task_ids):
+    audience = defaultdict(set)
+    for task_id, user_id in TaskAccess.objects.filter(
+            task_id__in=task_ids).values_list('task_id', 'user_id'):
+        audience[task_id].add(user_id)
+    return audience
+
+
+def publish(event, project_ids=(), task_ids=(), user_ids=()):
+    """
+    Sends `event` once the current transaction commits, to the given project
+    channels and to the user channels of `user_ids`. For `task_ids` the
+    tasks' projects and everyone with access to them are resolved at commit.
+    """
+    project_ids = {pk for pk in project_ids if pk}
+    task_ids = {pk for pk in task_ids if pk}
+    user_ids = {pk for pk in user_ids if pk}
+
+    def send():
+        projects, users = set(project_ids), set(user_ids)
+        if task_ids:
+            projects.update(Task.objects.filter(
+                pk__in=task_ids, project__isnull=False).values_list('project_id', flat=True))
+            users.update(TaskAccess.objects.filter(
+                task_id__in=task_ids).values_list('user_id', flat=True))
+        channels = [*map(project_channel, projects), *map(user_channel, users)]
+        if channels:
+            get_broker().publish(channels, event)
+
+    transaction.on_commit(send, robust=True)
+
+
+def publish_membership(membership, action):
+    publish(
+        change_event(membership, action, project=membership.project_id, user=membership.user_id),
+        project_ids=[membership.project_id],
+        user_ids=[membership.user_id],
+    )
@@ -0,0 +1,106 @@
+import hashlib
+import uuid
+from functools import partial
+from django.core.cache import cache
+from django.db import transaction
+from .models import Project, Membership, TaskAccess
+
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+
+
+def task_tag(task_id):
+    return f'task:{task_id}'
+
+
+def project_tag(project_id):
+    return f'project:{project_id}'
+
+
+def task_list_tag(user_id):
+    return f'task-list:{user_id}'
+
+
+def project_list_tag(user_id):
+    return f'project-list:{user_id}'
+
+
+def tag_key(tag):
+    return f'cache-tag:{tag}'
+
+
+def response_key(view, user_id, request):
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    digest = hashlib.md5(
+        repr((request.build_absolute_uri(request.path), query)).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'response:{view}:{user_id}:{digest}'
+
+
+def invalidate_tags(*tags):
+    keys = [tag_key(tag) for tag in tags]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Deleted again on commit so a read that raced the transaction cannot
+    # store an entry against the pre-commit data under a fresh tag version.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def invalidate_tasks(*task_ids):
+    task_ids = {pk for pk in task_ids if pk}
+    if not task_ids:
+        return
+    user_ids = TaskAccess.objects.filter(
+        task_id__in=task_ids).values_list('user_id', flat=True).distinct()
+    invalidate_tags(
+        *map(task_tag, task_ids), *map(task_list_tag, user_ids))
+
+
+def invalidate_projects(*project_ids):
+    project_ids = {pk for pk in project_ids if pk}
+    if not project_ids:
+        return
+    user_ids = Membership.objects.filter(
+        project_id__in=project_ids).values_list('user_id', flat=True).union(
+        Project.objects.filter(pk__in=project_ids).values_list('creator_id', flat=True))
+    invalidate_tags(
+        *map(project_tag, project_ids), *map(project_list_tag, user_ids))
+
+
+def invalidate_task_lists(*user_ids):
+    invalidate_tags(*map(task_list_tag, filter(None, user_ids)))
+
+
+def invalidate_project_lists(*user_ids):
+    invalidate_tags(*map(project_list_tag, filter(None, user_ids)))
+
+
+def cached_response(key, tags, compute):
+    """
+    Returns `(data, hit)`. Entries record the tag versions current before
+    `compute` ran and are discarded once any of those tags is invalidated.
+    """
+    tag_keys = [tag_key(tag) for tag in tags]
+    found = cache.get_many([key, *tag_keys])
+    for name in tag_keys:
+        if name not in found:
+            version = uuid.uuid4().hex
+            if not cache.add(name, version, timeout=None):
+                version = cache.get(name, version)
+            found[name] = version
+    versions = [found[name] for name in tag_keys]
+
+    entry = found.get(key)
+    if entry is not None and entry['tags'] == versions:
+        return entry['data'], True
+
+    data = compute()
+    if data is not None:
+        cache.set(key, {'tags': versions, 'data': data}, RESPONSE_CACHE_TIMEOUT)
+    return data, False
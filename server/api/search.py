@@ -0,0 +1,109 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+from .models import SearchEntry
+
+Kind = SearchEntry.KindChoices
+INDEXED_FIELDS = ['title', 'body', 'task', 'project']
+
+
+def task_entry(task):
+    return SearchEntry(
+        kind=Kind.TASK, object_id=task.pk, task_id=task.pk,
+        title=task.title, body=task.description or '')
+
+
+def comment_entry(comment):
+    return SearchEntry(
+        kind=Kind.COMMENT, object_id=comment.pk, task_id=comment.task_id,
+        body=comment.text)
+
+
+def project_entry(project):
+    return SearchEntry(
+        kind=Kind.PROJECT, object_id=project.pk, project_id=project.pk,
+        title=project.title, body=project.description or '')
+
+
+def index_entries(entries):
+    SearchEntry.objects.bulk_create(
+        entries,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=INDEXED_FIELDS,
+    )
+
+
+def remove_entries(kind, object_ids):
+    SearchEntry.objects.filter(kind=kind, object_id__in=object_ids).delete()
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+class DatabaseSearchBackend:
+    """
+    Portable fallback that filters SearchEntry with LIKE. It scans the table,
+    so databases with a native full-text index should get their own backend.
+    """
+
+    def search(self, user, query, kinds=None, limit=20, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        entries = SearchEntry.objects.visible_to(user)
+        if kinds:
+            entries = entries.filter(kind__in=kinds)
+        for term in terms:
+            entries = entries.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        results = list(entries.order_by('kind', 'id')[offset:offset + limit])
+        for entry in results:
+            entry.snippet = entry.body[:160]
+            entry.rank = None
+        return results
+
+
+class SQLiteSearchBackend(DatabaseSearchBackend):
+    """
+    Serves queries from the `api_search_fts` FTS5 table, an external-content
+    index over SearchEntry kept in sync by triggers (see migration 0009).
+    """
+    sql = '''
+        SELECT e.*,
+               snippet(api_search_fts, -1, '[', ']', '...', 16) AS snippet,
+               bm25(api_search_fts, 5.0, 1.0) AS rank
+        FROM api_search_fts
+        JOIN api_searchentry e ON e.id = api_search_fts.rowid
+        WHERE api_search_fts MATCH %s AND e.id IN ({visible})
+        ORDER BY rank, e.id
+        LIMIT %s OFFSET %s
+    '''
+
+    def match_expression(self, terms):
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, user, query, kinds=None, limit=20, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        visible = SearchEntry.objects.visible_to(user)
+        if kinds:
+            visible = visible.filter(kind__in=kinds)
+        visible_sql, visible_params = visible.values('id').query.sql_with_params()
+        return list(SearchEntry.objects.raw(
+            self.sql.format(visible=visible_sql),
+            [self.match_expression(terms), *visible_params, limit, offset],
+        ))
+
+
+def get_search_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return DatabaseSearchBackend()
@@ -1,16 +1,76 @@
+import uuid
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Project, Role, Membership, Task, Asset, Subtask, Comment
+from rest_framework.reverse import reverse
+from .models import (
+    Project, Role, Membership, Task, TaskAccess, Asset, AssetUpload, Subtask, Comment,
+    Change, SearchEntry, member_preview_prefetch,
+)
+from .search import index_entries, task_entry
+from .stats import invalidate_project_stats
+from .access import get_project_access
+from .changes import Action, addressed, change_row, record
+from .realtime import change_event, publish, publish_membership, task_audience
+from .response_cache import invalidate_tasks, invalidate_task_lists, invalidate_project_lists
+from .versions import touch_tasks, touch_projects
+from .validators import validate_due_date, validate_file_type
 from users.serializers import UserSerializer
 from users.models import User
 
 
+class ExpandableFieldsMixin:
+    """
+    Honors the `fields` and `expand` sets placed in the serializer context.
+    Relations listed in `expandable_fields` are only serialized when expanded,
+    and only loaded through their `get_prefetch_plan` entry when expanded.
+    """
+    expandable_fields = ()
+
+    def is_requested(self, field_name):
+        fields = self.context.get('fields')
+        return fields is None or field_name in fields or self.is_expanded(field_name)
+
+    def is_expanded(self, field_name):
+        return field_name in self.context.get('expand', ())
+
+    @property
+    def _readable_fields(self):
+        for field in super()._readable_fields:
+            name = field.field_name
+            if not self.is_requested(name):
+                continue
+            if name in self.expandable_fields and not self.is_expanded(name):
+                continue
+            yield field
+
+    @classmethod
+    def get_prefetch_plan(cls):
+        return {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand):
+        plan = cls.get_prefetch_plan()
+        for name in cls.expandable_fields:
+            if name in expand and name in plan:
+                queryset = queryset.prefetch_related(*plan[name])
+        return queryset
+
+
 class AssetSerializer(serializers.ModelSerializer):
     uploaded_by = UserSerializer(read_only=True)
+    download_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Asset
-        fields = ['id', 'file', 'task', 'project',
+        fields = ['id', 'file', 'filename', 'download_url', 'task', 'project',
                   'uploaded_by', 'uploaded_at']
+        read_only_fields = ['filename']
+
+    def get_download_url(self, obj):
+        return reverse('asset-download', kwargs={'pk': obj.pk}, request=self.context.get('request'))
 
     def validate(self, data):
         task = data.get('task')
@@ -24,6 +84,36 @@ class AssetSerializer(serializers.ModelSerializer):
         return data
 
 
+class AssetUploadSerializer(serializers.ModelSerializer):
+    checksum = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    class Meta:
+        model = AssetUpload
+        fields = ['id', 'filename', 'size', 'offset', 'checksum', 'task', 'project',
+                  'created_at', 'updated_at', 'expires_at']
+        read_only_fields = ['offset', 'expires_at']
+
+    def validate_filename(self, value):
+        validate_file_type(File(None, name=value))
+        return value
+
+    def validate_checksum(self, value):
+        return value.lower()
+
+    def validate(self, data):
+        task = data.get('task')
+        project = data.get('project')
+        if bool(task) == bool(project):
+            raise serializers.ValidationError(
+                "Upload must belong to either a task or a project.")
+        user = self.context['request'].user
+        if task and not Task.objects.visible_to(user).filter(pk=task.pk).exists():
+            raise serializers.ValidationError({'task': 'Task not found.'})
+        if project and not Project.objects.visible_to(user).filter(pk=project.pk).exists():
+            raise serializers.ValidationError({'project': 'Project not found.'})
+        return data
+
+
 class RoleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Role
@@ -33,15 +123,60 @@ class RoleSerializer(serializers.ModelSerializer):
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Comment
         fields = '__all__'
         read_only_fields = ['user', 'task', 'created_at', 'updated_at']
 
+    @classmethod
+    def serialize_thread(cls, comments, context, max_depth=None):
+        children = {}
+        for comment in comments:
+            children.setdefault(comment.parent_id, []).append(comment)
+        thread_context = {
+            **context,
+            'comment_children': children,
+            'comment_depth': 0,
+            'comment_max_depth': max_depth,
+        }
+        return cls(children.get(None, []), many=True, context=thread_context).data
+
+    def get_child_comments(self, obj):
+        children = self.context.get('comment_children')
+        if children is None:
+            return list(obj.replies.select_related('user'))
+        return children.get(obj.id, [])
+
     def get_replies(self, obj):
-        replies = obj.replies.all()
-        return CommentSerializer(replies, many=True, context=self.context).data
+        depth = self.context.get('comment_depth', 0) + 1
+        max_depth = self.context.get('comment_max_depth')
+        if max_depth is not None and depth > max_depth:
+            return []
+        return CommentSerializer(
+            self.get_child_comments(obj),
+            many=True,
+            context={**self.context, 'comment_depth': depth},
+        ).data
+
+    def get_reply_count(self, obj):
+        if hasattr(obj, 'num_replies'):
+            return obj.num_replies
+        if 'comment_children' in self.context:
+            return len(self.get_child_comments(obj))
+        return obj.replies.count()
+
+
+class CommentListSerializer(CommentSerializer):
+    replies = None
+
+    def validate_parent(self, parent):
+        task = self.context.get('task')
+        if parent and task and parent.task_id != task.id:
+            raise serializers.ValidationError(
+                "Parent comment must belong to the same task.")
+        return parent
 
 
 class SubtaskSerializer(serializers.ModelSerializer):
@@ -54,7 +189,7 @@ class SubtaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subtask
         fields = ['id', 'task', 'title', 'assigned_to',
-                  'is_completed', 'created_at', 'updated_at']
+                  'is_completed', 'position', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'task']
 
     def to_representation(self, instance):
@@ -98,6 +233,15 @@ class SubtaskSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class TaskSubtaskSerializer(SubtaskSerializer):
+    id = serializers.UUIDField(required=False)
+    assigned_to = serializers.UUIDField(
+        source='assigned_to_id',
+        required=False,
+        allow_null=True
+    )
+
+
 class MembershipSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     role = RoleSerializer(read_only=True)
@@ -131,6 +275,11 @@ class MembershipSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         role_id = validated_data.pop('role_id', None)
+        user_id = validated_data.pop('user_id', None)
+
+        if user_id and user_id != instance.user_id:
+            raise serializers.ValidationError(
+                {'user_id': 'A membership cannot be moved to another user.'})
 
         if role_id:
             try:
@@ -142,11 +291,143 @@ class MembershipSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class BulkMembershipItemSerializer(serializers.Serializer):
+    user = serializers.CharField(max_length=254)
+    role = serializers.CharField(
+        max_length=50, required=False, default=Membership.RoleChoices.MEMBER)
+
+
+class BulkMembershipSerializer(serializers.Serializer):
+    MAX_MEMBERS = 5000
+
+    members = BulkMembershipItemSerializer(
+        many=True, allow_empty=False, max_length=MAX_MEMBERS)
+
+    @staticmethod
+    def lookup_key(value):
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            return value
+
+    @classmethod
+    def split_keys(cls, values):
+        ids, names = set(), set()
+        for key in map(cls.lookup_key, values):
+            (ids if isinstance(key, uuid.UUID) else names).add(key)
+        return ids, names
+
+    def validate(self, attrs):
+        project = self.context['project']
+        members = attrs['members']
+
+        user_ids, emails = self.split_keys(member['user'] for member in members)
+        users = {}
+        for user_id, email in User.objects.filter(
+                Q(id__in=user_ids) | Q(email__in=emails)).values_list('id', 'email'):
+            users[user_id] = users[email] = user_id
+
+        role_ids, role_names = self.split_keys(member['role'] for member in members)
+        roles = {}
+        for role in Role.objects.filter(Q(id__in=role_ids) | Q(name__in=role_names)):
+            roles[role.id] = roles[role.name] = role
+
+        errors, resolved = [], []
+        for member in members:
+            user_id = users.get(self.lookup_key(member['user']))
+            role = roles.get(self.lookup_key(member['role']))
+            error = {}
+            if user_id is None:
+                error['user'] = f"No user matches '{member['user']}'."
+            if role is None:
+                error['role'] = f"No role matches '{member['role']}'."
+            errors.append(error)
+            resolved.append((user_id, role))
+
+        if any(errors):
+            raise serializers.ValidationError({'members': errors})
+
+        attrs['resolved'] = resolved
+        attrs['existing'] = set(
+            Membership.objects.filter(
+                project=project, user_id__in=[user_id for user_id, _ in resolved]
+            ).values_list('user_id', flat=True)
+        )
+        return attrs
+
+    def create(self, validated_data):
+        project = self.context['project']
+        skipped = set(validated_data['existing'])
+        memberships, pending = [], []
+
+        for index, (user_id, role) in enumerate(validated_data['resolved']):
+            if user_id in skipped:
+                pending.append((index, user_id, None))
+                continue
+            skipped.add(user_id)
+            membership = Membership(user_id=user_id, project=project, role=role)
+            memberships.append(membership)
+            pending.append((index, user_id, membership.pk))
+
+        with transaction.atomic():
+            Membership.objects.bulk_create(
+                memberships, batch_size=500, ignore_conflicts=True)
+            # Rows that lost a race with a concurrent import were ignored and
+            # never got the primary keys generated for them here.
+            inserted = set(Membership.objects.filter(
+                pk__in=[membership.pk for membership in memberships]).values_list('pk', flat=True))
+            memberships = [membership for membership in memberships if membership.pk in inserted]
+            touch_projects(project.pk)
+            invalidate_task_lists(*[membership.user_id for membership in memberships])
+            TaskAccess.objects.grant(
+                TaskAccess.ReasonChoices.MEMBER,
+                [membership.user_id for membership in memberships],
+                list(project.tasks.values_list('id', flat=True)),
+            )
+            record([change_row(membership) for membership in memberships])
+            for membership in memberships:
+                publish_membership(membership, 'created')
+
+        return [
+            {'index': index, 'user': user_id,
+             'status': 'created' if pk in inserted else 'skipped'}
+            for index, user_id, pk in pending
+        ]
+
+
+class ProjectSummarySerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
-    members = serializers.SerializerMethodField(read_only=True)
-    tasks = serializers.SerializerMethodField(read_only=True)
+    task_counts = serializers.SerializerMethodField()
+    overdue_count = serializers.IntegerField(read_only=True)
+    member_count = serializers.IntegerField(read_only=True)
+    asset_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'title', 'description', 'creator', 'task_counts',
+            'overdue_count', 'member_count', 'asset_count',
+            'created_at', 'updated_at'
+        ]
+
+    def get_task_counts(self, obj):
+        return {
+            'total': obj.task_total,
+            'pending': obj.task_pending,
+            'in_progress': obj.task_in_progress,
+            'completed': obj.task_completed,
+        }
+
+    def to_representation(self, instance):
+        if not hasattr(instance, 'task_total'):
+            instance = Project.objects.with_summary().select_related(
+                'creator').get(pk=instance.pk)
+        return super().to_representation(instance)
+
+
+class ProjectSerializer(ProjectSummarySerializer):
     assets = AssetSerializer(many=True, read_only=True)
+    member_preview = serializers.SerializerMethodField()
 
     member_assignments = serializers.ListField(
         child=serializers.DictField(),
@@ -155,49 +436,60 @@ class ProjectSerializer(serializers.ModelSerializer):
         help_text="List of members with their roles: [{'user_id': 'uuid', 'role_id': 'uuid'}]"
     )
 
-    class Meta:
-        model = Project
-        fields = [
-            'id', 'title', 'description', 'creator', 'members', 'tasks',
-            'assets', 'member_assignments', 'created_at', 'updated_at'
+    class Meta(ProjectSummarySerializer.Meta):
+        fields = ProjectSummarySerializer.Meta.fields + [
+            'assets', 'member_preview', 'member_assignments'
         ]
 
-    def get_members(self, obj):
-        memberships = obj.memberships.all()
-        return MembershipSerializer(memberships, many=True).data
+    def get_member_preview(self, obj):
+        if not hasattr(obj, 'member_preview'):
+            prefetch_related_objects([obj], member_preview_prefetch())
+        return MembershipSerializer(obj.member_preview, many=True).data
 
-    def get_tasks(self, obj):
-        tasks = obj.tasks.all()
-        return TaskSerializer(tasks, many=True, context=self.context).data
+    def validate_member_assignments(self, value):
+        assignments = []
+        for assignment in value:
+            user_id, role_id = assignment.get('user_id'), assignment.get('role_id')
+            if not (user_id and role_id):
+                continue
+            try:
+                assignments.append((uuid.UUID(str(user_id)), uuid.UUID(str(role_id))))
+            except ValueError:
+                raise serializers.ValidationError(
+                    f'Invalid user_id or role_id: user_id={user_id}, role_id={role_id}')
+        return assignments
 
     def create(self, validated_data):
         member_assignments = validated_data.pop('member_assignments', [])
-        project = super().create(validated_data)
-
-        for assignment in member_assignments:
-            user_id = assignment.get('user_id')
-            role_id = assignment.get('role_id')
-
-            if user_id and role_id:
-                try:
-                    user = User.objects.get(id=user_id)
-                    role = Role.objects.get(id=role_id)
-                    Membership.objects.create(
-                        user=user,
-                        project=project,
-                        role=role
-                    )
-                except (User.DoesNotExist, Role.DoesNotExist):
-                    raise serializers.ValidationError({
-                        'member_assignments': f'Invalid user_id or role_id: user_id={user_id}, role_id={role_id}'
-                    })
+        users = User.objects.in_bulk({user_id for user_id, _ in member_assignments})
+        roles = Role.objects.in_bulk({role_id for _, role_id in member_assignments})
+
+        memberships = {}
+        for user_id, role_id in member_assignments:
+            user, role = users.get(user_id), roles.get(role_id)
+            if user is None or role is None:
+                raise serializers.ValidationError({
+                    'member_assignments': f'Invalid user_id or role_id: user_id={user_id}, role_id={role_id}'
+                })
+            memberships.setdefault(user.pk, role)
+
+        with transaction.atomic():
+            project = super().create(validated_data)
+            created = Membership.objects.bulk_create([
+                Membership(user_id=user_id, project=project, role=role)
+                for user_id, role in memberships.items()
+            ])
+            invalidate_project_lists(*memberships)
+            record([change_row(membership) for membership in created])
+            for membership in created:
+                publish_membership(membership, 'created')
 
         return project
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
-    subtasks = SubtaskSerializer(many=True, required=False)
+    subtasks = TaskSubtaskSerializer(many=True, required=False)
     assignees = serializers.PrimaryKeyRelatedField(
         many=True,
         queryset=User.objects.all()
@@ -208,7 +500,7 @@ class TaskSerializer(serializers.ModelSerializer):
         allow_null=True,
         write_only=True
     )
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     assets = AssetSerializer(many=True, required=False)
 
     class Meta:
@@ -219,26 +511,115 @@ class TaskSerializer(serializers.ModelSerializer):
             'comments', 'assets', 'created_at', 'updated_at'
         ]
 
-    def create(self, validated_data):
-        subtasks_data = validated_data.pop('subtasks', [])
-        assignees_data = validated_data.pop('assignees', [])
+    expandable_fields = ('subtasks', 'comments', 'assets')
+
+    @classmethod
+    def get_prefetch_plan(cls):
+        return {
+            'assignees': [Prefetch('assignees')],
+            'subtasks': [
+                Prefetch('subtasks', queryset=Subtask.objects.select_related(
+                    'assigned_to').order_by('position', 'created_at')),
+            ],
+            'comments': [
+                Prefetch('comments', queryset=Comment.objects.select_related('user')),
+            ],
+            'assets': [
+                Prefetch('assets', queryset=Asset.objects.select_related('uploaded_by')),
+            ],
+        }
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand):
+        queryset = super().setup_eager_loading(queryset, expand)
+        queryset = queryset.select_related('creator').prefetch_related(
+            *cls.get_prefetch_plan()['assignees'])
+        if 'project' in expand:
+            queryset = queryset.select_related('project__creator')
+        return queryset
+
+    def get_comments(self, obj):
+        return CommentSerializer.serialize_thread(
+            obj.comments.all(),
+            self.context,
+            max_depth=self.context.get('comment_depth'),
+        )
 
-        task = Task.objects.create(**validated_data)
+    def check_subtask_assignees(self, subtasks_data, assignee_ids):
+        allowed = set(assignee_ids) | {self.context['request'].user.id}
+        unassigned = {
+            data['assigned_to_id'] for data in subtasks_data
+            if data.get('assigned_to_id') and data['assigned_to_id'] not in allowed
+        }
+        if not unassigned:
+            return
 
-        if assignees_data:
-            task.assignees.set(assignees_data)
+        users = User.objects.in_bulk(unassigned)
+        raise serializers.ValidationError({
+            "subtasks": [
+                f"User '{users[pk].username}' must be assigned to the main task before being assigned to a subtask."
+                if pk in users else f'Invalid pk "{pk}" - object does not exist.'
+                for pk in unassigned
+            ]
+        })
 
-        current_user = self.context['request'].user
-        assignee_ids = [user.id for user in assignees_data]
+    def reconcile_subtasks(self, task, subtasks_data):
+        existing = {subtask.id: subtask for subtask in task.subtasks.all()}
+        unknown = [
+            str(data['id']) for data in subtasks_data
+            if data.get('id') and data['id'] not in existing
+        ]
+        if unknown:
+            raise serializers.ValidationError({
+                "subtasks": [f"Subtask '{pk}' does not belong to this task." for pk in unknown]
+            })
+
+        now = timezone.now()
+        kept, changed, created = set(), [], []
+        changed_fields = set()
+        for position, data in enumerate(subtasks_data):
+            data.setdefault('position', position)
+            subtask = existing.get(data.pop('id', None))
+            if subtask is None:
+                created.append(Subtask(task=task, **data))
+                continue
+
+            kept.add(subtask.id)
+            updates = {
+                field: value for field, value in data.items()
+                if getattr(subtask, field) != value
+            }
+            if updates:
+                for field, value in updates.items():
+                    setattr(subtask, field, value)
+                subtask.updated_at = now
+                changed.append(subtask)
+                changed_fields.update(updates)
 
-        for subtask_data in subtasks_data:
-            assigned_user = subtask_data.get('assigned_to')
-            if assigned_user:
-                if assigned_user.id not in assignee_ids and assigned_user != current_user:
-                    raise serializers.ValidationError({
-                        "subtasks": f"User '{assigned_user.username}' must be assigned to the main task before being assigned to a subtask."
-                    })
-            Subtask.objects.create(task=task, **subtask_data)
+        removed = existing.keys() - kept
+        if removed:
+            Subtask.objects.filter(id__in=removed).delete()
+        if changed:
+            Subtask.objects.bulk_update(changed, [*changed_fields, 'updated_at'])
+        if created:
+            Subtask.objects.bulk_create(created)
+        record([change_row(subtask) for subtask in changed + created])
+        if removed or changed or created:
+            touch_tasks(task.pk)
+            invalidate_project_stats(task.project_id)
+
+    def create(self, validated_data):
+        subtasks_data = validated_data.pop('subtasks', [])
+        assignees_data = validated_data.pop('assignees', [])
+        self.check_subtask_assignees(
+            subtasks_data, [user.id for user in assignees_data])
+
+        with transaction.atomic():
+            task = Task.objects.create(**validated_data)
+            if assignees_data:
+                task.assignees.set(assignees_data)
+            if subtasks_data:
+                self.reconcile_subtasks(task, subtasks_data)
 
         return task
 
@@ -246,44 +627,33 @@ class TaskSerializer(serializers.ModelSerializer):
         subtasks_data = validated_data.pop('subtasks', None)
         assignees_data = validated_data.pop('assignees', None)
 
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        if assignees_data is not None:
-            instance.assignees.set(assignees_data)
-
         if subtasks_data is not None:
-            instance.subtasks.all().delete()
+            assignees = instance.assignees.all() if assignees_data is None else assignees_data
+            assignee_ids = [user.id for user in assignees]
+            self.check_subtask_assignees(subtasks_data, assignee_ids)
 
-            current_user = self.context['request'].user
-            current_assignees = list(instance.assignees.all(
-            )) if assignees_data is None else assignees_data
-            assignee_ids = [user.id for user in current_assignees]
+        with transaction.atomic():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-            for subtask_data in subtasks_data:
-                assigned_user = subtask_data.get('assigned_to')
-                if assigned_user:
-                    if assigned_user.id not in assignee_ids and assigned_user != current_user:
-                        raise serializers.ValidationError({
-                            "subtasks": f"User '{assigned_user.username}' must be assigned to the main task before being assigned to a subtask."
-                        })
-                Subtask.objects.create(task=instance, **subtask_data)
+            if assignees_data is not None:
+                instance.assignees.set(assignees_data)
 
-        return instance
+            if subtasks_data is not None:
+                self.reconcile_subtasks(instance, subtasks_data)
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data['assignees'] = UserSerializer(
-            instance.assignees.all(), many=True).data
-        return data
+        return instance
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        data['assignees'] = UserSerializer(
-            instance.assignees.all(), many=True).data
+        if 'assignees' in data and self.is_expanded('assignees'):
+            data['assignees'] = UserSerializer(
+                instance.assignees.all(), many=True).data
 
-        if instance.project:
+        if not self.is_requested('project'):
+            return data
+        if instance.project and self.is_expanded('project'):
             data['project'] = {
                 'id': instance.project.id,
                 'title': instance.project.title,
@@ -296,4 +666,367 @@ class TaskSerializer(serializers.ModelSerializer):
                     'email': instance.project.creator.email,
                 },
             }
+        else:
+            data['project'] = instance.project_id
         return data
+
+
+class BulkSubtaskItemSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=200)
+    assigned_to = serializers.UUIDField(required=False, allow_null=True)
+    is_completed = serializers.BooleanField(required=False, default=False)
+
+
+class BulkSubtaskChangeSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    is_completed = serializers.BooleanField(required=False)
+    assigned_to = serializers.UUIDField(
+        source='assigned_to_id', required=False, allow_null=True)
+    position = serializers.IntegerField(min_value=0, required=False)
+
+
+class BulkSubtaskSerializer(serializers.Serializer):
+    MAX_CHANGES = 1000
+
+    subtasks = BulkSubtaskChangeSerializer(
+        many=True, allow_empty=False, max_length=MAX_CHANGES)
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        task = self.context['task']
+        changes = attrs['subtasks']
+
+        subtasks = Subtask.objects.filter(task=task).in_bulk(
+            [change['id'] for change in changes])
+        allowed_assignees = set(task.assignees.values_list('id', flat=True))
+        allowed_assignees.add(task.creator_id)
+
+        errors = []
+        seen = set()
+        for change in changes:
+            errors.append(self.validate_change(
+                change, user, task, subtasks, allowed_assignees, seen))
+
+        if any(errors):
+            raise serializers.ValidationError({'subtasks': errors})
+
+        attrs['instances'] = subtasks
+        return attrs
+
+    def validate_change(self, change, user, task, subtasks, allowed_assignees, seen):
+        if change['id'] in seen:
+            return {"id": "This subtask appears in more than one change."}
+        seen.add(change['id'])
+
+        subtask = subtasks.get(change['id'])
+        if subtask is None:
+            return {"id": "Subtask not found."}
+        if subtask.assigned_to_id not in (None, user.id) and task.creator_id != user.id:
+            return {"id": "You can only update your own subtasks or if you're the task creator"}
+
+        assigned_to = change.get('assigned_to_id')
+        if assigned_to and assigned_to not in allowed_assignees:
+            return {"assigned_to": "This user is not assigned to the parent task and is not the task creator."}
+        return {}
+
+    def create(self, validated_data):
+        subtasks = validated_data['instances']
+        now = timezone.now()
+
+        changed, fields, results = [], set(), []
+        for index, change in enumerate(validated_data['subtasks']):
+            subtask = subtasks[change['id']]
+            updates = {
+                field: value for field, value in change.items()
+                if field != 'id' and getattr(subtask, field) != value
+            }
+            for field, value in updates.items():
+                setattr(subtask, field, value)
+            if updates:
+                subtask.updated_at = now
+                changed.append(subtask)
+                fields.update(updates)
+            results.append({
+                'index': index,
+                'id': subtask.pk,
+                'status': 'updated' if updates else 'unchanged',
+            })
+
+        if changed:
+            task = self.context['task']
+            with transaction.atomic():
+                Subtask.objects.bulk_update(
+                    changed, [*fields, 'updated_at'], batch_size=500)
+                record([change_row(subtask) for subtask in changed])
+                touch_tasks(task.pk)
+                invalidate_project_stats(task.project_id)
+                publish(change_event(task, 'updated', project=task.project_id), task_ids=[task.pk])
+
+        return results
+
+
+class BulkTaskItemSerializer(serializers.Serializer):
+    OPERATIONS = ('create', 'update', 'delete')
+    SCALAR_FIELDS = ('title', 'description', 'priority', 'status', 'due_date', 'due_time')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.UUIDField(required=False)
+    title = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(allow_blank=True, required=False)
+    project = serializers.UUIDField(required=False, allow_null=True)
+    priority = serializers.ChoiceField(choices=Task.PriorityChoices.choices, required=False)
+    status = serializers.ChoiceField(choices=Task.StatusChoices.choices, required=False)
+    due_date = serializers.DateField(
+        required=False, allow_null=True, validators=[validate_due_date])
+    due_time = serializers.TimeField(required=False, allow_null=True)
+    assignees = serializers.ListField(child=serializers.UUIDField(), required=False)
+    subtasks = BulkSubtaskItemSerializer(many=True, required=False)
+
+    def validate(self, data):
+        if data['op'] == 'create' and not data.get('title'):
+            raise serializers.ValidationError({"title": "This field is required."})
+        if data['op'] != 'create' and not data.get('id'):
+            raise serializers.ValidationError({"id": "This field is required."})
+        if data['op'] == 'update' and 'subtasks' in data:
+            raise serializers.ValidationError({
+                "subtasks": "Subtasks cannot be changed through a bulk update."
+            })
+        return data
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    MAX_OPERATIONS = 5000
+
+    operations = BulkTaskItemSerializer(
+        many=True, allow_empty=False, max_length=MAX_OPERATIONS)
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        operations = attrs['operations']
+
+        task_ids = [op['id'] for op in operations if op['op'] != 'create']
+        tasks = Task.objects.visible_to(user).in_bulk(task_ids)
+
+        project_ids = {op['project'] for op in operations if op.get('project')}
+        project_ids.update(task.project_id for task in tasks.values() if task.project_id)
+        access = get_project_access(self.context['request'])
+        access.load_creators(project_ids)
+        allowed_projects = {
+            project_id for project_id in project_ids if access.can_access(project_id)}
+        project_members = {}
+        for project_id, user_id in Membership.objects.filter(
+                project_id__in=project_ids).values_list('project_id', 'user_id'):
+            project_members.setdefault(project_id, set()).add(user_id)
+
+        user_ids = set()
+        for op in operations:
+            user_ids.update(op.get('assignees', []))
+            user_ids.update(
+                subtask['assigned_to'] for subtask in op.get('subtasks', [])
+                if subtask.get('assigned_to')
+            )
+        existing_users = set(
+            User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+
+        # Tasks moved to another project keep their assignees unless the
+        # operation replaces them, so those must be members there too.
+        moved = [
+            op['id'] for op in operations
+            if op['op'] == 'update' and 'project' in op and 'assignees' not in op
+            and op['id'] in tasks and op['project'] != tasks[op['id']].project_id
+        ]
+        current_assignees = {}
+        if moved:
+            for task_id, user_id in Task.assignees.through.objects.filter(
+                    task_id__in=moved).values_list('task_id', 'user_id'):
+                current_assignees.setdefault(task_id, set()).add(user_id)
+
+        errors = []
+        seen = set()
+        for op in operations:
+            errors.append(self.validate_operation(
+                op, user, tasks, allowed_projects, project_members, existing_users,
+                current_assignees, seen))
+
+        if any(errors):
+            raise serializers.ValidationError({'operations': errors})
+
+        attrs['tasks'] = tasks
+        return attrs
+
+    def validate_operation(self, op, user, tasks, allowed_projects, project_members, existing_users,
+                           current_assignees, seen):
+        task = None
+        if op['op'] != 'create':
+            if op['id'] in seen:
+                return {"id": "This task appears in more than one operation."}
+            seen.add(op['id'])
+            task = tasks.get(op['id'])
+            if task is None:
+                return {"id": "Task not found."}
+            if task.creator_id != user.id:
+                return {"id": "Only the task creator can modify this task."}
+            if op['op'] == 'delete':
+                return {}
+
+        project_id = op['project'] if 'project' in op else getattr(task, 'project_id', None)
+        if 'project' in op and project_id and project_id not in allowed_projects:
+            return {"project": "You must be a project member to create tasks in this project"}
+
+        assignees = set(op.get('assignees', []))
+        missing = assignees - existing_users
+        if missing:
+            return {"assignees": f"Invalid user IDs: {', '.join(sorted(map(str, missing)))}"}
+        if project_id:
+            outsiders = assignees - project_members.get(project_id, set())
+            if outsiders:
+                return {"assignees": f"Users must be members of the project to be assigned: {', '.join(sorted(map(str, outsiders)))}"}
+            outsiders = current_assignees.get(op.get('id'), set()) - project_members.get(project_id, set())
+            if outsiders:
+                return {"assignees": f"Current assignees are not members of the new project; reassign or remove them: {', '.join(sorted(map(str, outsiders)))}"}
+
+        for subtask in op.get('subtasks', []):
+            assigned_to = subtask.get('assigned_to')
+            if not assigned_to:
+                continue
+            if assigned_to not in existing_users:
+                return {"subtasks": f"Invalid user ID: {assigned_to}"}
+            if assigned_to not in assignees and assigned_to != user.id:
+                return {"subtasks": f"User '{assigned_to}' must be assigned to the main task before being assigned to a subtask."}
+        return {}
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        operations = validated_data['operations']
+        tasks = validated_data['tasks']
+        fields = BulkTaskItemSerializer.SCALAR_FIELDS
+        Assignment = Task.assignees.through
+        now = timezone.now()
+
+        created, updated, deleted = [], [], []
+        assignments, subtasks, replaced = [], [], []
+        affected_projects, previous_projects = set(), {}
+        results = []
+
+        for index, op in enumerate(operations):
+            if op['op'] == 'create':
+                task = Task(
+                    creator=user,
+                    project_id=op.get('project'),
+                    **{field: op[field] for field in fields if field in op}
+                )
+                created.append(task)
+                # The task is new, so its subtasks are numbered from 0 in order.
+                subtasks += [
+                    Subtask(
+                        task=task,
+                        title=subtask['title'],
+                        assigned_to_id=subtask.get('assigned_to'),
+                        is_completed=subtask.get('is_completed', False),
+                        position=position,
+                    )
+                    for position, subtask in enumerate(op.get('subtasks', []))
+                ]
+            else:
+                task = tasks[op['id']]
+                affected_projects.add(task.project_id)
+                previous_projects[task.pk] = task.project_id
+                if op['op'] == 'delete':
+                    deleted.append(task.pk)
+                    results.append({'index': index, 'op': 'delete', 'id': task.pk, 'status': 'deleted'})
+                    continue
+                for field in fields:
+                    if field in op:
+                        setattr(task, field, op[field])
+                if 'project' in op:
+                    task.project_id = op['project']
+                task.updated_at = now
+                updated.append(task)
+                if 'assignees' in op:
+                    replaced.append(task.pk)
+
+            affected_projects.add(task.project_id)
+            if 'assignees' in op:
+                assignments += [
+                    Assignment(task_id=task.pk, user_id=user_id)
+                    for user_id in set(op['assignees'])
+                ]
+            results.append({
+                'index': index,
+                'op': op['op'],
+                'id': task.pk,
+                'status': 'created' if op['op'] == 'create' else 'updated',
+            })
+
+        with transaction.atomic():
+            Task.objects.bulk_create(created, batch_size=500)
+            if updated:
+                Task.objects.bulk_update(
+                    updated, [*fields, 'project', 'updated_at'], batch_size=500)
+            if replaced:
+                Assignment.objects.filter(task_id__in=replaced).delete()
+            Assignment.objects.bulk_create(assignments, batch_size=1000)
+            Subtask.objects.bulk_create(subtasks, batch_size=1000)
+            if deleted:
+                invalidate_tasks(*deleted)
+                deleted_audience = task_audience(deleted)
+                Task.objects.filter(id__in=deleted).delete()
+            # Once before the sync for users losing access, once after for
+            # users gaining it.
+            invalidate_tasks(*[task.pk for task in updated])
+            previous_audience = task_audience([task.pk for task in updated])
+            TaskAccess.objects.sync_tasks(created + updated)
+            index_entries([task_entry(task) for task in created + updated])
+            touch_tasks(*[task.pk for task in updated])
+            invalidate_tasks(*[task.pk for task in created])
+            touch_projects(*affected_projects)
+            invalidate_project_stats(*affected_projects)
+
+            audience = task_audience([task.pk for task in created + updated])
+            changes = []
+            for task in updated:
+                changes += addressed(
+                    task, Action.REVOKE, previous_audience[task.pk] - audience[task.pk])
+            changes += [change_row(task) for task in created + updated]
+            changes += [change_row(subtask) for subtask in subtasks]
+            for task_id in deleted:
+                changes += addressed(tasks[task_id], Action.DELETE, deleted_audience[task_id])
+            record(changes)
+
+            for action, batch in (('created', created), ('updated', updated)):
+                for task in batch:
+                    publish(
+                        change_event(task, action, project=task.project_id),
+                        project_ids=[task.project_id, previous_projects.get(task.pk)],
+                        user_ids=audience[task.pk],
+                    )
+            for task_id in deleted:
+                publish(
+                    change_event(tasks[task_id], 'deleted', project=previous_projects[task_id]),
+                    project_ids=[previous_projects[task_id]],
+                    user_ids=deleted_audience[task_id],
+                )
+
+        return results
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source='kind')
+    id = serializers.UUIDField(source='object_id')
+    snippet = serializers.CharField()
+    rank = serializers.FloatField(allow_null=True)
+
+    class Meta:
+        model = SearchEntry
+        fields = ['type', 'id', 'task', 'project', 'title', 'snippet', 'rank']
+
+
+class ChangeSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source='kind')
+    id = serializers.UUIDField(source='object_id')
+    task = serializers.UUIDField(source='task_id')
+    project = serializers.UUIDField(source='project_id')
+
+    class Meta:
+        model = Change
+        fields = ['seq', 'type', 'action', 'id', 'task', 'project']
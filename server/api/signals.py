@@ -0,0 +1,400 @@
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from .changes import Action, addressed, change_row, record
+from .models import Task, TaskAccess, Membership, Subtask, Comment, Project, Asset, AssetUpload, SearchEntry, Change
+from .realtime import change_event, publish, publish_membership, task_audience
+from .response_cache import (
+    invalidate_tasks, invalidate_projects, invalidate_task_lists, invalidate_project_lists,
+)
+from .search import index_entries, remove_entries, task_entry, comment_entry, project_entry
+from .stats import invalidate_project_stats
+from .uploads import discard, part_path
+from .versions import touch_tasks, touch_projects
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_project(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_project_id, instance._previous_creator_id = (
+        Task.objects.filter(pk=instance.pk).values_list('project_id', 'creator_id').first()
+        or (None, None)
+    )
+
+
+@receiver(post_save, sender=Task)
+def sync_task_access(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_project_id = getattr(instance, '_previous_project_id', None)
+    invalidate_project_stats(instance.project_id, previous_project_id)
+    touch_projects(instance.project_id, previous_project_id)
+    # Access only depends on the creator and project (assignees are synced
+    # by sync_assignee_access), so other edits skip the sync.
+    moved = not created and previous_project_id != instance.project_id
+    if created or moved or getattr(instance, '_previous_creator_id', None) != instance.creator_id:
+        if moved:
+            # Members of the old project are about to lose access.
+            invalidate_tasks(instance.pk)
+            instance._previous_audience = task_audience([instance.pk])[instance.pk]
+        TaskAccess.objects.sync_task(instance)
+    invalidate_tasks(instance.pk)
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def sync_assignee_access(sender, instance, action, reverse, pk_set, **kwargs):
+    reason = TaskAccess.ReasonChoices.ASSIGNEE
+
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_task_ids = list(
+                instance.assigned_tasks.values_list('id', flat=True))
+        return
+
+    if reverse:
+        user_ids, task_ids = [instance.pk], pk_set
+    else:
+        user_ids, task_ids = pk_set, [instance.pk]
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            changed = task_ids or getattr(instance, '_cleared_task_ids', [])
+            invalidate_project_stats(*Task.objects.filter(
+                pk__in=changed).values_list('project_id', flat=True))
+            touch_tasks(*changed)
+        else:
+            invalidate_project_stats(instance.project_id)
+            touch_tasks(instance.pk)
+
+    if action in ('post_add', 'post_remove') and user_ids:
+        invalidate_task_lists(*user_ids)
+
+    if action == 'post_add':
+        TaskAccess.objects.grant(reason, user_ids, task_ids)
+    elif action == 'post_remove':
+        TaskAccess.objects.revoke(reason, user_ids, task_ids)
+    elif action == 'post_clear':
+        if reverse:
+            TaskAccess.objects.revoke(
+                reason, [instance.pk], getattr(instance, '_cleared_task_ids', []))
+        else:
+            TaskAccess.objects.filter(task=instance, reason=reason).delete()
+
+
+@receiver(post_save, sender=Membership)
+def grant_member_access(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    touch_projects(instance.project_id)
+    if not created:
+        return
+    invalidate_task_lists(instance.user_id)
+    task_ids = Task.objects.filter(
+        project_id=instance.project_id).values_list('id', flat=True)
+    TaskAccess.objects.grant(
+        TaskAccess.ReasonChoices.MEMBER, [instance.user_id], task_ids)
+
+
+@receiver(post_delete, sender=Membership)
+def revoke_member_access(sender, instance, **kwargs):
+    touch_projects(instance.project_id)
+    invalidate_task_lists(instance.user_id)
+    invalidate_project_lists(instance.user_id)
+    still_member = Membership.objects.filter(
+        user_id=instance.user_id, project_id=instance.project_id).exists()
+    if still_member:
+        return
+    TaskAccess.objects.filter(
+        user_id=instance.user_id,
+        task__project_id=instance.project_id,
+        reason=TaskAccess.ReasonChoices.MEMBER,
+    ).delete()
+
+
+@receiver(pre_delete, sender=Task)
+def invalidate_deleted_task(sender, instance, origin=None, **kwargs):
+    # Bulk and cascading deletes invalidate every task up front instead.
+    if origin in (None, instance):
+        invalidate_tasks(instance.pk)
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_deleted_project(sender, instance, **kwargs):
+    invalidate_projects(instance.pk)
+    invalidate_tasks(*instance.tasks.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_stats(sender, instance, **kwargs):
+    invalidate_project_stats(instance.project_id)
+    touch_projects(instance.project_id)
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+def invalidate_subtask_stats(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or origin not in (None, instance):
+        return
+    touch_tasks(instance.task_id)
+    invalidate_project_stats(
+        Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True).first())
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    index_entries([task_entry(instance)])
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_entries([comment_entry(instance)])
+        touch_tasks(instance.task_id)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Task, Project)):
+        return
+    remove_entries(SearchEntry.KindChoices.COMMENT, [instance.pk])
+    touch_tasks(instance.task_id)
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_entries([project_entry(instance)])
+        invalidate_projects(instance.pk)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def touch_asset_owner(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, (Task, Project)):
+        return
+    touch_tasks(instance.task_id)
+    touch_projects(instance.project_id)
+
+
+@receiver(pre_save, sender=Asset)
+def remember_asset_file(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.file._committed:
+        return
+    instance._previous_file = (
+        Asset.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Asset)
+def release_replaced_file(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_file', None)
+    if not raw and previous != instance.file.name:
+        Asset.release_files(previous)
+
+
+@receiver(post_delete, sender=Asset)
+def release_asset_file(sender, instance, **kwargs):
+    Asset.release_files(instance.file.name)
+
+
+@receiver(post_delete, sender=AssetUpload)
+def discard_upload(sender, instance, **kwargs):
+    path = part_path(instance)
+    transaction.on_commit(lambda: discard(path))
+
+
+def saved(created):
+    return 'created' if created else 'updated'
+
+
+@receiver(post_save, sender=Task)
+def publish_task(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(
+            change_event(instance, saved(created), project=instance.project_id),
+            project_ids=[getattr(instance, '_previous_project_id', None)],
+            task_ids=[instance.pk],
+        )
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def publish_assignees(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # Removed assignees have lost access by commit time, so they are named
+    # explicitly.
+    if reverse:
+        for task_id in pk_set or getattr(instance, '_cleared_task_ids', []):
+            publish(
+                {'type': 'task', 'action': 'updated', 'id': task_id},
+                task_ids=[task_id],
+                user_ids=[instance.pk],
+            )
+    else:
+        publish(
+            change_event(instance, 'updated', project=instance.project_id),
+            task_ids=[instance.pk],
+            user_ids=pk_set or (),
+        )
+
+
+@receiver(pre_delete, sender=Task)
+def remember_task_audience(sender, instance, origin=None, **kwargs):
+    # Bulk deletes publish their own events; cascades are covered by the
+    # project's event.
+    if origin in (None, instance):
+        instance._audience = task_audience([instance.pk])[instance.pk]
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_task(sender, instance, **kwargs):
+    if hasattr(instance, '_audience'):
+        publish(
+            change_event(instance, 'deleted', project=instance.project_id),
+            project_ids=[instance.project_id],
+            user_ids=instance._audience,
+        )
+
+
+@receiver(post_save, sender=Subtask)
+@receiver(post_delete, sender=Subtask)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def publish_task_child(sender, instance, created=None, raw=False, origin=None, **kwargs):
+    if raw or origin not in (None, instance):
+        return
+    action = 'deleted' if created is None else saved(created)
+    publish(change_event(instance, action, task=instance.task_id), task_ids=[instance.task_id])
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def publish_asset(sender, instance, created=None, raw=False, origin=None, **kwargs):
+    if raw or origin not in (None, instance):
+        return
+    action = 'deleted' if created is None else saved(created)
+    publish(
+        change_event(instance, action, task=instance.task_id, project=instance.project_id),
+        project_ids=[instance.project_id],
+        task_ids=[instance.task_id],
+    )
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def publish_membership_change(sender, instance, created=None, raw=False, origin=None, **kwargs):
+    if raw or origin not in (None, instance):
+        return
+    publish_membership(instance, 'deleted' if created is None else saved(created))
+
+
+@receiver(post_save, sender=Project)
+def publish_project(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish(
+            change_event(instance, saved(created)),
+            project_ids=[instance.pk],
+            user_ids=[instance.creator_id],
+        )
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_audience(sender, instance, **kwargs):
+    instance._audience = {
+        instance.creator_id,
+        *instance.memberships.values_list('user_id', flat=True),
+    }
+
+
+@receiver(post_delete, sender=Project)
+def publish_deleted_project(sender, instance, **kwargs):
+    publish(
+        change_event(instance, 'deleted'),
+        project_ids=[instance.pk],
+        user_ids=instance._audience,
+    )
+
+
+@receiver(post_save, sender=Task)
+def log_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes = [change_row(instance)]
+    previous_audience = vars(instance).pop('_previous_audience', None)
+    if previous_audience:
+        current = set(TaskAccess.objects.filter(task=instance).values_list('user_id', flat=True))
+        changes[:0] = addressed(instance, Action.REVOKE, previous_audience - current)
+    record(changes)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Subtask)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Asset)
+@receiver(post_save, sender=Membership)
+def log_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record([change_row(instance)])
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def log_assignees(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        task_ids, user_ids = pk_set or getattr(instance, '_cleared_task_ids', []), [instance.pk]
+        tasks = list(Task.objects.filter(pk__in=task_ids).only('id', 'project_id'))
+    else:
+        tasks, user_ids = [instance], pk_set or []
+    changes = [change_row(task) for task in tasks]
+    if action != 'post_add' and user_ids:
+        kept = set(TaskAccess.objects.filter(
+            task__in=tasks, user_id__in=user_ids).values_list('task_id', 'user_id'))
+        changes += [
+            change_row(task, Action.REVOKE, user_id)
+            for task in tasks for user_id in user_ids if (task.pk, user_id) not in kept
+        ]
+    record(changes)
+
+
+@receiver(post_delete, sender=Task)
+def log_deleted_task(sender, instance, origin=None, **kwargs):
+    if hasattr(instance, '_audience'):
+        record(addressed(instance, Action.DELETE, instance._audience))
+    elif not isinstance(origin, QuerySet):
+        # Bulk deletes record their own tombstones.
+        record([change_row(instance, Action.DELETE)])
+
+
+@receiver(post_delete, sender=Project)
+def log_deleted_project(sender, instance, **kwargs):
+    record(addressed(instance, Action.DELETE, instance._audience))
+
+
+@receiver(post_delete, sender=Subtask)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Asset)
+@receiver(post_delete, sender=Membership)
+def log_deleted(sender, instance, origin=None, **kwargs):
+    # Cascades from a project are tagged with it so that its tombstone
+    # carries them along.
+    fields = {'project_id': origin.pk} if isinstance(origin, Project) else {}
+    changes = [change_row(instance, Action.DELETE, **fields)]
+    if isinstance(instance, Membership) and not isinstance(origin, Project):
+        still_visible = Project.objects.filter(
+            Q(creator_id=instance.user_id) | Q(memberships__user_id=instance.user_id),
+            pk=instance.project_id,
+        ).exists()
+        if not still_visible:
+            changes.append(Change(
+                kind=Change.KindChoices.PROJECT, object_id=instance.project_id,
+                action=Action.REVOKE, project_id=instance.project_id,
+                user_id=instance.user_id,
+            ))
+    record(changes)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from functools import partial
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import Task
+
+PROJECT_STATS_TIMEOUT = 60 * 60
+
+
+def alias(prefix, value):
+    return f"{prefix}_{value.lower().replace(' ', '_')}"
+
+
+def project_stats_key(project_id):
+    return f'project-stats:{project_id}'
+
+
+def invalidate_project_stats(*project_ids):
+    keys = [project_stats_key(pk) for pk in project_ids if pk]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Deleted again on commit, as stats computed by a read that raced the
+    # transaction would otherwise be cached from pre-commit data.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def compute_project_stats(project):
+    today = timezone.now().date()
+    week_end = today + timedelta(days=6 - today.weekday())
+    open_tasks = ~Q(status=Task.StatusChoices.COMPLETED)
+
+    def count_tasks(condition):
+        return Count('id', filter=condition, distinct=True)
+
+    aggregates = {'total': Count('id', distinct=True)}
+    for value, _ in Task.StatusChoices.choices:
+        aggregates[alias('status', value)] = count_tasks(Q(status=value))
+    for value, _ in Task.PriorityChoices.choices:
+        aggregates[alias('priority', value)] = count_tasks(Q(priority=value))
+    aggregates['overdue'] = count_tasks(open_tasks & Q(due_date__lt=today))
+    aggregates['due_this_week'] = count_tasks(
+        open_tasks & Q(due_date__gte=today, due_date__lte=week_end))
+    aggregates['subtask_total'] = Count('subtasks')
+    aggregates['subtask_completed'] = Count(
+        'subtasks', filter=Q(subtasks__is_completed=True))
+
+    totals = Task.objects.filter(project=project).aggregate(**aggregates)
+
+    assignees = (
+        Task.assignees.through.objects
+        .filter(task__project=project)
+        .exclude(task__status=Task.StatusChoices.COMPLETED)
+        .values('user_id', 'user__username', 'user__first_name', 'user__last_name')
+        .annotate(open_tasks=Count('task_id'))
+        .order_by('-open_tasks', 'user__username')
+    )
+
+    subtasks = totals['subtask_total']
+    return {
+        'total_tasks': totals['total'],
+        'by_status': {
+            value: totals[alias('status', value)] for value, _ in Task.StatusChoices.choices
+        },
+        'by_priority': {
+            value: totals[alias('priority', value)] for value, _ in Task.PriorityChoices.choices
+        },
+        'overdue': totals['overdue'],
+        'due_this_week': totals['due_this_week'],
+        'open_tasks_by_assignee': [
+            {
+                'user': {
+                    'id': row['user_id'],
+                    'username': row['user__username'],
+                    'first_name': row['user__first_name'],
+                    'last_name': row['user__last_name'],
+                },
+                'open_tasks': row['open_tasks'],
+            }
+            for row in assignees
+        ],
+        'subtasks': {
+            'total': subtasks,
+            'completed': totals['subtask_completed'],
+            'completion_ratio': round(totals['subtask_completed'] / subtasks, 4) if subtasks else None,
+        },
+        'computed_for': today,
+    }
+
+
+def get_project_stats(project):
+    key = project_stats_key(project.pk)
+    stats = cache.get(key)
+    if stats is None or stats['computed_for'] != timezone.now().date():
+        stats = compute_project_stats(project)
+        cache.set(key, stats, PROJECT_STATS_TIMEOUT)
+    return stats
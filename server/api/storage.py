@@ -0,0 +1,74 @@
+import hashlib
+import os
+import tempfile
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOCK_SIZE = 64 * 1024
+
+
+class HashedFile(File):
+    """
+    A file on local disk whose SHA-256 is already known. Storage moves it
+    into place instead of copying or hashing it again.
+    """
+
+    def __init__(self, file, name, sha256):
+        super().__init__(file, name=name)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def blob_name(directory, digest):
+    return os.path.join(directory, digest[:2], digest)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, under assets/<ab>/<sha256>. The digest is
+    computed while the content is written to a temporary file next to the
+    blobs, which is then renamed into place or dropped if the blob exists.
+    Assets sharing a blob share its name, so the number of Asset rows with
+    that name is its reference count (see Asset.release_files). The blob is
+    claimed before it is looked up, so when saved inside a transaction it
+    cannot be released until the asset referring to it has been committed.
+    """
+
+    def claim(self, name):
+        from .models import AssetBlob  # models imports this module
+        AssetBlob.claim(name)
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        digest = getattr(content, 'sha256', None)
+        if digest and hasattr(content, 'temporary_file_path'):
+            name = blob_name(directory, digest)
+            self.claim(name)
+            return name if self.exists(name) else super()._save(name, content)
+
+        staging = self.path(os.path.join(directory, 'tmp'))
+        os.makedirs(staging, exist_ok=True)
+        hasher = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=staging, delete=False) as temporary:
+            try:
+                for chunk in content.chunks(BLOCK_SIZE):
+                    hasher.update(chunk)
+                    temporary.write(chunk)
+            except BaseException:
+                os.unlink(temporary.name)
+                raise
+
+        name = blob_name(directory, hasher.hexdigest())
+        self.claim(name)
+        if self.exists(name):
+            os.unlink(temporary.name)
+            return name
+        with open(temporary.name, 'rb') as staged:
+            return super()._save(name, HashedFile(staged, temporary.name, hasher.hexdigest()))
+
+
+asset_storage = ContentAddressedStorage()
@@ -1,3 +1,1364 @@
-from django.test import TestCase
+import base64
+import datetime
+import hashlib
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+from . import uploads
+from .access import get_project_access
+from .checks import check_change_log_writers
+from .models import (
+    Project, Role, Membership, Task, TaskAccess, Subtask, Comment, Asset, AssetBlob, AssetUpload,
+    SearchEntry, Change,
+)
+from .pagination import TaskCursorPagination
+from .realtime import Subscription, get_broker, project_channel, user_channel
+from .serializers import BulkMembershipSerializer
+from .stats import project_stats_key
+from .websocket import websocket_application
 
-# Create your tests here.
+
+class TaskAccessTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.member = User.objects.create_user(email='member@example.com', password='password123')
+        self.role = Role.objects.create(name='Member')
+        self.project = Project.objects.create(creator=self.owner, title='Project')
+        self.task = Task.objects.create(creator=self.owner, title='Task', project=self.project)
+
+    def access(self, task=None):
+        return set(TaskAccess.objects.filter(
+            task=task or self.task).values_list('user_id', 'reason'))
+
+    def test_assignees_are_kept_in_sync(self):
+        reasons = TaskAccess.ReasonChoices
+        self.task.assignees.add(self.member)
+        self.assertIn((self.member.id, reasons.ASSIGNEE), self.access())
+        self.task.assignees.remove(self.member)
+        self.assertEqual(self.access(), {(self.owner.id, reasons.CREATOR)})
+
+        self.task.assignees.add(self.member)
+        self.task.assignees.clear()
+        self.assertEqual(self.access(), {(self.owner.id, reasons.CREATOR)})
+        self.task.assignees.add(self.member)
+        self.member.assigned_tasks.clear()
+        self.assertEqual(self.access(), {(self.owner.id, reasons.CREATOR)})
+
+    def test_memberships_grant_and_revoke_project_tasks(self):
+        membership = Membership.objects.create(user=self.member, project=self.project, role=self.role)
+        self.task.assignees.add(self.member)
+        self.assertEqual({reason for user_id, reason in self.access() if user_id == self.member.id},
+                         {TaskAccess.ReasonChoices.MEMBER, TaskAccess.ReasonChoices.ASSIGNEE})
+        membership.delete()
+        self.assertEqual({reason for user_id, reason in self.access() if user_id == self.member.id},
+                         {TaskAccess.ReasonChoices.ASSIGNEE})
+
+    def test_moving_a_task_swaps_project_members(self):
+        Membership.objects.create(user=self.member, project=self.project, role=self.role)
+        other = Project.objects.create(creator=self.owner, title='Other')
+        newcomer = User.objects.create_user(email='newcomer@example.com', password='password123')
+        Membership.objects.create(user=newcomer, project=other, role=self.role)
+        self.task.project = other
+        self.task.save()
+        self.assertEqual(self.access(), {
+            (self.owner.id, TaskAccess.ReasonChoices.CREATOR),
+            (newcomer.id, TaskAccess.ReasonChoices.MEMBER),
+        })
+
+    def test_plain_edits_skip_the_access_sync(self):
+        Membership.objects.create(user=self.member, project=self.project, role=self.role)
+        self.task.title = 'Renamed'
+        with self.assertNumQueries(7):
+            self.task.save()
+        self.task.status = 'Completed'
+        with self.assertNumQueries(6):
+            self.task.save(update_fields=['status'])
+        self.task.creator = self.member
+        self.task.save()
+        self.assertIn((self.member.id, TaskAccess.ReasonChoices.CREATOR), self.access())
+        self.assertNotIn((self.owner.id, TaskAccess.ReasonChoices.CREATOR), self.access())
+
+    def test_deleting_a_project_drops_its_access_rows(self):
+        Membership.objects.create(user=self.member, project=self.project, role=self.role)
+        self.project.delete()
+        self.assertFalse(TaskAccess.objects.exists())
+
+    def test_memberships_cannot_be_moved(self):
+        membership = Membership.objects.create(user=self.member, project=self.project, role=self.role)
+        membership = Membership.objects.get(pk=membership.pk)
+        membership.user = self.owner
+        with self.assertRaises(ValueError):
+            membership.save()
+        membership = Membership.objects.only('id', 'role').get(pk=membership.pk)
+        membership.role = Role.objects.create(name='Guest')
+        membership.save()
+
+
+class TaskQueryBudgetTests(TestCase):
+    expand = 'subtasks,comments,assets,assignees,project'
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='owner@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        Membership.objects.create(
+            user=self.user, project=self.project, role=Role.objects.create(name='Member'))
+
+    def create_tasks(self, count):
+        start = Task.objects.count()
+        for i in range(start, start + count):
+            helper = User.objects.create_user(email=f'helper{i}@example.com', password='password123')
+            task = Task.objects.create(creator=self.user, title=f'Task {i}', project=self.project)
+            task.assignees.add(self.user, helper)
+            Subtask.objects.create(task=task, title='Subtask', assigned_to=helper)
+            comment = Comment.objects.create(task=task, user=helper, text='Comment')
+            reply = Comment.objects.create(task=task, user=self.user, text='Reply', parent=comment)
+            Comment.objects.create(task=task, user=helper, text='Nested reply', parent=reply)
+            Asset.objects.create(task=task, uploaded_by=helper, file='assets/spec.pdf')
+
+    def test_task_list_query_count_is_constant(self):
+        self.create_tasks(2)
+        with self.assertNumQueries(5) as small:
+            self.client.get(f'/api/tasks/?expand={self.expand}')
+
+        self.create_tasks(8)
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.client.get(f'/api/tasks/?expand={self.expand}')
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_task_detail_query_count(self):
+        self.create_tasks(1)
+        task = Task.objects.get()
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/tasks/{task.id}/?expand={self.expand}')
+        self.assertEqual(len(response.data['subtasks']), 1)
+
+    def test_fields_trim_the_payload(self):
+        self.create_tasks(1)
+        response = self.client.get('/api/tasks/?fields=id,title')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        response = self.client.get('/api/tasks/?fields=id&expand=subtasks')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'subtasks'})
+        response = self.client.get('/api/tasks/')
+        self.assertNotIn('subtasks', response.data['results'][0])
+        self.assertIn('title', response.data['results'][0])
+
+    def test_unknown_expansions_are_ignored(self):
+        self.create_tasks(1)
+        task = Task.objects.get()
+        plain = self.client.get(f'/api/tasks/{task.id}/')
+        for url in (f'/api/tasks/{task.id}/', '/api/tasks/'):
+            response = self.client.get(f'{url}?expand=bogus,creator')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/tasks/{task.id}/?expand=bogus')
+        self.assertEqual(set(response.data), set(plain.data))
+
+    def test_expanded_query_count_is_bounded_per_relation(self):
+        self.create_tasks(3)
+        counts = {}
+        for expand in ('', 'assignees', self.expand):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(f'/api/tasks/?expand={expand}')
+            counts[expand] = len(queries.captured_queries)
+        self.assertLessEqual(counts[self.expand], counts[''] + len(self.expand.split(',')))
+        self.assertLessEqual(counts['assignees'], counts[''] + 1)
+
+    def test_comment_thread_is_nested_once(self):
+        self.create_tasks(1)
+        task = Task.objects.get()
+        response = self.client.get(f'/api/tasks/{task.id}/?expand=comments')
+        self.assertEqual(len(response.data['comments']), 1)
+        reply = response.data['comments'][0]['replies'][0]
+        self.assertEqual(reply['replies'][0]['text'], 'Nested reply')
+
+        response = self.client.get(f'/api/tasks/{task.id}/?expand=comments&comment_depth=1')
+        reply = response.data['comments'][0]['replies'][0]
+        self.assertEqual(reply['replies'], [])
+        self.assertEqual(reply['reply_count'], 1)
+
+
+class CommentAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='author@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(creator=self.user, title='Task')
+
+    def test_top_level_comments_are_paginated_with_reply_counts(self):
+        for i in range(3):
+            comment = Comment.objects.create(task=self.task, user=self.user, text=f'Comment {i}')
+        Comment.objects.create(task=self.task, user=self.user, text='Reply', parent=comment)
+
+        response = self.client.get(f'/api/tasks/{self.task.id}/comments/?page_size=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['text'] for c in response.data['results']], ['Comment 2', 'Comment 1'])
+        self.assertEqual(response.data['results'][0]['reply_count'], 1)
+        self.assertNotIn('replies', response.data['results'][0])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([c['text'] for c in response.data['results']], ['Comment 0'])
+
+        response = self.client.get(f'/api/comments/{comment.id}/replies/')
+        self.assertEqual([c['text'] for c in response.data['results']], ['Reply'])
+
+    def test_reply_must_belong_to_the_same_task(self):
+        other = Task.objects.create(creator=self.user, title='Other')
+        parent = Comment.objects.create(task=other, user=self.user, text='Elsewhere')
+        response = self.client.post(
+            f'/api/tasks/{self.task.id}/comments/', {'text': 'Reply', 'parent': parent.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            f'/api/tasks/{self.task.id}/comments/', {'text': 'Hello'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user']['id'], str(self.user.id))
+
+
+class ProjectSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='lead@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        role = Role.objects.create(name='Member')
+        self.projects = []
+        for i in range(3):
+            project = Project.objects.create(creator=self.user, title=f'Project {i}')
+            for j in range(2):
+                member = User.objects.create_user(email=f'm{i}{j}@example.com', password='password123')
+                Membership.objects.create(user=member, project=project, role=role)
+            Task.objects.create(creator=self.user, title='Open', project=project)
+            Task.objects.create(
+                creator=self.user, title='Done', project=project,
+                status=Task.StatusChoices.COMPLETED)
+            Asset.objects.create(project=project, uploaded_by=self.user, file='assets/a.pdf')
+            self.projects.append(project)
+
+    def test_project_list_is_summarised_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/projects/')
+        self.assertEqual(len(response.data), 3)
+        summary = response.data[0]
+        self.assertEqual(summary['task_counts'], {
+            'total': 2, 'pending': 1, 'in_progress': 0, 'completed': 1})
+        self.assertEqual(summary['member_count'], 2)
+        self.assertEqual(summary['asset_count'], 1)
+        self.assertNotIn('tasks', summary)
+
+    def test_project_tasks_and_members_are_paginated(self):
+        project = self.projects[0]
+        response = self.client.get(f'/api/project/{project.id}/tasks/')
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(f'/api/project/{project.id}/members/?page_size=1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_project_detail_carries_member_preview(self):
+        project = self.projects[0]
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/project/{project.id}/')
+        self.assertEqual(response.data['member_count'], 2)
+        self.assertEqual(len(response.data['member_preview']), 2)
+        self.assertNotIn('members', response.data)
+
+    def test_members_can_be_filtered_by_role_and_prefix(self):
+        project = self.projects[0]
+        guest = User.objects.create_user(
+            email='visitor@example.com', password='password123', first_name='Vera')
+        Membership.objects.create(user=guest, project=project, role=Role.objects.create(name='Guest'))
+        url = f'/api/project/{project.id}/members/'
+
+        response = self.client.get(f'{url}?role=Guest')
+        self.assertEqual([m['user']['id'] for m in response.data['results']], [str(guest.id)])
+        response = self.client.get(f'{url}?search=ver')
+        self.assertEqual([m['user']['id'] for m in response.data['results']], [str(guest.id)])
+        response = self.client.get(f'{url}?role=Owner')
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_project_is_created_with_member_assignments(self):
+        role = Role.objects.get(name='Member')
+        member = User.objects.create_user(email='new@example.com', password='password123')
+        response = self.client.post('/api/projects/', {
+            'title': 'New', 'member_assignments': [
+                {'user_id': str(member.id), 'role_id': str(role.id)}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        project = Project.objects.get(pk=response.data['id'])
+        self.assertEqual(list(project.memberships.values_list('user_id', 'role_id')), [(member.id, role.id)])
+
+        for user_id in ('not-a-uuid', str(role.id)):
+            response = self.client.post('/api/projects/', {
+                'title': 'Bad', 'member_assignments': [{'user_id': user_id, 'role_id': str(role.id)}],
+            }, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Project.objects.filter(title='Bad').exists())
+
+class ProjectStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='stats@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.url = f'/api/project/{self.project.id}/stats/'
+
+    def test_stats_are_aggregated_and_invalidated(self):
+        today = timezone.now().date()
+        task = Task.objects.create(
+            creator=self.user, title='Urgent', project=self.project,
+            priority=Task.PriorityChoices.URGENT)
+        task.assignees.add(self.user)
+        Task.objects.filter(pk=task.pk).update(due_date=today - datetime.timedelta(days=1))
+        Task.objects.create(
+            creator=self.user, title='Done', project=self.project,
+            status=Task.StatusChoices.COMPLETED)
+        Subtask.objects.create(task=task, title='One', is_completed=True)
+        Subtask.objects.create(task=task, title='Two')
+
+        with self.assertNumQueries(3):
+            stats = self.client.get(self.url).data
+        self.assertEqual(stats['total_tasks'], 2)
+        self.assertEqual(stats['by_status']['Completed'], 1)
+        self.assertEqual(stats['by_priority']['Urgent'], 1)
+        self.assertEqual(stats['overdue'], 1)
+        self.assertEqual(stats['open_tasks_by_assignee'][0]['open_tasks'], 1)
+        self.assertEqual(stats['subtasks']['completion_ratio'], 0.5)
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        Subtask.objects.create(task=task, title='Three', is_completed=True)
+        stats = self.client.get(self.url).data
+        self.assertEqual(stats['subtasks']['total'], 3)
+
+    def test_stats_cached_by_a_read_racing_a_write_are_dropped_on_commit(self):
+        stale = self.client.get(self.url).data
+        operations = [{'op': 'create', 'title': f'Task {i}', 'project': str(self.project.id)}
+                      for i in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                response = self.client.post('/api/tasks/bulk/', {'operations': operations}, format='json')
+                Task.objects.create(creator=self.user, title='Single', project=self.project)
+                # A concurrent reader caches what it saw before the commit.
+                cache.set(project_stats_key(self.project.pk), stale)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url).data['total_tasks'], 4)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='pager@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = datetime.date.today()
+        for index, due_date in enumerate([today, None, today, None, today + datetime.timedelta(days=1)]):
+            Task.objects.create(
+                creator=self.user, title=f'Task {index}', due_date=due_date,
+                priority=['Low', 'High'][index % 2])
+        self.expected = [
+            str(pk) for pk in Task.objects.order_by(
+                F('due_date').desc(nulls_last=True), 'priority', 'id').values_list('id', flat=True)
+        ]
+
+    def cursor(self, payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def test_pages_walk_forward_and_back_across_null_due_dates(self):
+        pages, url = [], '/api/tasks/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            pages.append([task['id'] for task in response.data['results']])
+            url = response.data['next']
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+        url, back = response.data['previous'], []
+        while url:
+            response = self.client.get(url)
+            back = [task['id'] for task in response.data['results']] + back
+            url = response.data['previous']
+        self.assertEqual(back, self.expected[:4])
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.client.get('/api/tasks/?page_size=0').data['results']), 1)
+        paginator = TaskCursorPagination()
+        request = Request(RequestFactory().get('/', {'page_size': 1000}))
+        self.assertEqual(paginator.get_page_size(request), paginator.max_page_size)
+
+    def test_forged_cursors_are_rejected(self):
+        for position in (
+                ['garbage', 'Low', 'x'], [None, 'Low', 'not-uuid'],
+                [{'a': 1}, 'Low', 'x'], [None, None, None], ['2030-01-01', 'Low']):
+            response = self.client.get('/api/tasks/', {'cursor': self.cursor({'p': position, 'r': 0})})
+            self.assertEqual(response.status_code, 404, position)
+        self.assertEqual(self.client.get('/api/tasks/', {'cursor': 'not base64!'}).status_code, 404)
+
+
+class TaskDashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_facet_counts_and_first_pages(self):
+        today = timezone.now().date()
+        mine = Task.objects.create(creator=self.user, title='Mine')
+        Task.objects.filter(pk=mine.pk).update(due_date=today)
+        for i in range(3):
+            task = Task.objects.create(creator=self.other, title=f'Assigned {i}')
+            task.assignees.add(self.user)
+        Task.objects.filter(title='Assigned 0').update(due_date=today - datetime.timedelta(days=2))
+        Task.objects.create(creator=self.other, title='Hidden')
+
+        response = self.client.get('/api/tasks/dashboard/?page_size=2')
+        self.assertEqual(response.data['counts'], {
+            'total': 4, 'assigned_to_me': 3, 'created_by_me': 1, 'due_today': 1, 'overdue': 1,
+        })
+        assigned = response.data['buckets']['assigned_to_me']
+        self.assertEqual(len(assigned['results']), 2)
+
+        response = self.client.get(assigned['next'])
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class TaskBulkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='bulk@example.com', password='password123')
+        self.member = User.objects.create_user(email='member@example.com', password='password123')
+        self.outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Import')
+        role = Role.objects.create(name='Member')
+        Membership.objects.create(user=self.member, project=self.project, role=role)
+
+    def test_bulk_create_update_delete(self):
+        existing = Task.objects.create(creator=self.user, title='Old', project=self.project)
+        doomed = Task.objects.create(creator=self.user, title='Doomed')
+        operations = [
+            {
+                'op': 'create', 'title': f'Task {i}', 'project': str(self.project.id),
+                'assignees': [str(self.member.id)],
+                'subtasks': [{'title': 'Step', 'assigned_to': str(self.member.id)}],
+            }
+            for i in range(20)
+        ]
+        operations += [
+            {'op': 'update', 'id': str(existing.id), 'status': 'Completed',
+             'assignees': [str(self.member.id)]},
+            {'op': 'delete', 'id': str(doomed.id)},
+        ]
+        with self.assertNumQueries(37):
+            response = self.client.post('/api/tasks/bulk/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([r['status'] for r in response.data['results']][-3:],
+                         ['created', 'updated', 'deleted'])
+        self.assertEqual(Task.objects.filter(project=self.project).count(), 21)
+        self.assertEqual(Subtask.objects.count(), 20)
+        self.assertFalse(Task.objects.filter(pk=doomed.pk).exists())
+        existing.refresh_from_db()
+        self.assertEqual(existing.status, 'Completed')
+        self.assertEqual(Task.objects.visible_to(self.member).count(), 21)
+
+    def test_invalid_items_are_reported_and_nothing_is_written(self):
+        operations = [
+            {'op': 'create', 'title': 'Fine', 'project': str(self.project.id)},
+            {'op': 'create', 'title': 'Bad', 'project': str(self.project.id),
+             'assignees': [str(self.outsider.id)]},
+            {'op': 'delete', 'id': str(self.project.id)},
+        ]
+        response = self.client.post('/api/tasks/bulk/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['operations']
+        self.assertEqual(errors[0], {})
+        self.assertIn('assignees', errors[1])
+        self.assertIn('id', errors[2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_created_subtasks_keep_their_order(self):
+        operations = [{'op': 'create', 'title': 'Task', 'subtasks': [
+            {'title': f'Step {i}'} for i in range(3)]}]
+        response = self.client.post('/api/tasks/bulk/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(list(Subtask.objects.order_by('position').values_list('title', 'position')),
+                         [('Step 0', 0), ('Step 1', 1), ('Step 2', 2)])
+
+    def test_moving_a_task_requires_its_assignees_to_be_members_of_the_new_project(self):
+        task = Task.objects.create(creator=self.user, title='Personal')
+        task.assignees.add(self.outsider)
+        move = {'op': 'update', 'id': str(task.id), 'project': str(self.project.id)}
+        response = self.client.post('/api/tasks/bulk/', {'operations': [move]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assignees', response.data['operations'][0])
+        task.refresh_from_db()
+        self.assertIsNone(task.project_id)
+
+        move['assignees'] = [str(self.member.id)]
+        response = self.client.post('/api/tasks/bulk/', {'operations': [move]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(list(task.assignees.all()), [self.member])
+
+
+class TaskAssigneeAddTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='creator@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.task = Task.objects.create(creator=self.user, title='Task', project=self.project)
+        self.url = f'/api/task/{self.task.id}/assignees/'
+        role = Role.objects.create(name='Member')
+        self.members = []
+        for i in range(30):
+            member = User.objects.create_user(email=f'member{i}@example.com', password='password123')
+            Membership.objects.create(user=member, project=self.project, role=role)
+            self.members.append(member)
+
+    def test_assignees_are_added_in_constant_queries(self):
+        ids = [str(member.id) for member in self.members]
+        with self.assertNumQueries(9):
+            response = self.client.post(self.url, {'assignees': ids}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.task.assignees.count(), 30)
+        self.assertEqual(Task.objects.visible_to(self.members[0]).count(), 1)
+
+    def test_every_invalid_id_is_reported(self):
+        outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        ids = [str(self.members[0].id), str(outsider.id), 'not-a-uuid', '00000000-0000-0000-0000-000000000000']
+        response = self.client.post(self.url, {'assignees': ids}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['assignees']), 3)
+        self.assertEqual(self.task.assignees.count(), 0)
+
+
+class TaskSubtaskUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='creator@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(creator=self.user, title='Task')
+        self.url = f'/api/tasks/{self.task.id}/'
+
+    def create_subtasks(self, count):
+        start = self.task.subtasks.count()
+        Subtask.objects.bulk_create(
+            Subtask(task=self.task, title=f'Subtask {i}', position=i)
+            for i in range(start, start + count))
+        return [
+            {'id': str(pk), 'title': title, 'is_completed': is_completed, 'position': position}
+            for pk, title, is_completed, position in self.task.subtasks.order_by(
+                'position').values_list('id', 'title', 'is_completed', 'position')
+        ]
+
+    def patch_subtasks(self, subtasks):
+        return self.client.patch(self.url, {'subtasks': subtasks}, format='json')
+
+    def test_subtasks_are_reconciled_in_constant_queries(self):
+        subtasks = self.create_subtasks(10)
+        subtasks[0]['is_completed'] = not subtasks[0]['is_completed']
+        with self.assertNumQueries(20) as small:
+            self.patch_subtasks(subtasks[:-1] + [{'title': 'New'}])
+
+        subtasks = self.create_subtasks(300)
+        subtasks[0]['is_completed'] = not subtasks[0]['is_completed']
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = self.patch_subtasks(subtasks[:-1] + [{'title': 'New'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.task.subtasks.count(), 310)
+
+    def test_untouched_subtasks_keep_their_identity(self):
+        subtasks = self.create_subtasks(3)
+        before = Subtask.objects.get(id=subtasks[1]['id'])
+        subtasks[0]['title'] = 'Renamed'
+        response = self.patch_subtasks(subtasks[:2])
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(Subtask.objects.get(id=subtasks[0]['id']).title, 'Renamed')
+        self.assertEqual(Subtask.objects.get(id=subtasks[1]['id']).updated_at, before.updated_at)
+        self.assertFalse(Subtask.objects.filter(id=subtasks[2]['id']).exists())
+
+    def test_foreign_subtask_is_rejected(self):
+        other = Task.objects.create(creator=self.user, title='Other')
+        foreign = Subtask.objects.create(task=other, title='Foreign')
+        response = self.patch_subtasks([{'id': str(foreign.id), 'title': 'Stolen'}])
+        self.assertEqual(response.status_code, 400)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.title, 'Foreign')
+
+
+class SubtaskBulkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='creator@example.com', password='password123')
+        self.helper = User.objects.create_user(email='helper@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(creator=self.user, title='Task')
+        self.task.assignees.add(self.helper)
+        self.url = f'/api/task/{self.task.id}/subtasks/bulk/'
+
+    def create_subtasks(self, count):
+        Subtask.objects.bulk_create(
+            Subtask(task=self.task, title=f'Subtask {i}', position=i) for i in range(count))
+        return list(self.task.subtasks.order_by('position').values_list('id', flat=True))
+
+    def test_changes_are_applied_in_constant_queries(self):
+        ids = self.create_subtasks(200)
+        changes = [
+            {'id': str(pk), 'is_completed': True, 'assigned_to': str(self.helper.id),
+             'position': len(ids) - i}
+            for i, pk in enumerate(ids)
+        ]
+        with self.assertNumQueries(11):
+            response = self.client.post(self.url, {'subtasks': changes}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.task.subtasks.filter(is_completed=True, assigned_to=self.helper).count(), 200)
+        self.assertEqual(self.task.subtasks.order_by('position').first().id, ids[-1])
+
+    def test_every_invalid_change_is_reported(self):
+        ids = self.create_subtasks(2)
+        outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        foreign = Subtask.objects.create(
+            task=Task.objects.create(creator=self.user, title='Other'), title='Foreign')
+        changes = [
+            {'id': str(ids[0]), 'is_completed': True},
+            {'id': str(ids[1]), 'assigned_to': str(outsider.id)},
+            {'id': str(foreign.id), 'is_completed': True},
+        ]
+        response = self.client.post(self.url, {'subtasks': changes}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['subtasks'][0], {})
+        self.assertIn('assigned_to', response.data['subtasks'][1])
+        self.assertIn('id', response.data['subtasks'][2])
+        self.assertFalse(self.task.subtasks.filter(is_completed=True).exists())
+
+
+class ProjectMemberImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='creator@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.task = Task.objects.create(creator=self.user, title='Task', project=self.project)
+        self.member_role = Role.objects.create(name='Member')
+        self.guest_role = Role.objects.create(name='Guest')
+        self.url = f'/api/project/{self.project.id}/members/import/'
+
+    def create_users(self, count):
+        start = User.objects.count()
+        return [
+            User.objects.create_user(email=f'staff{i}@example.com', password='password123')
+            for i in range(start, start + count)
+        ]
+
+    def test_members_are_imported_in_constant_queries(self):
+        users = self.create_users(100)
+        existing = users[0]
+        Membership.objects.create(user=existing, project=self.project, role=self.member_role)
+        members = [{'user': str(user.id)} for user in users[:50]]
+        members += [{'user': user.email, 'role': 'Guest'} for user in users[50:]]
+        members.append({'user': str(users[1].id)})
+
+        with self.assertNumQueries(13):
+            response = self.client.post(self.url, {'members': members}, format='json')
+        self.assertEqual(response.status_code, 200)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses.count('created'), 99)
+        self.assertEqual(statuses.count('skipped'), 2)
+        self.assertEqual(self.project.memberships.filter(role=self.guest_role).count(), 50)
+        self.assertEqual(Task.objects.visible_to(users[99]).get(), self.task)
+
+    def test_rows_ignored_on_conflict_are_reported_as_skipped(self):
+        users = self.create_users(2)
+        serializer = BulkMembershipSerializer(
+            data={'members': [{'user': user.email} for user in users]},
+            context={'project': self.project})
+        self.assertTrue(serializer.is_valid())
+        # Added concurrently, after validation saw no membership.
+        Membership.objects.create(user=users[0], project=self.project, role=self.member_role)
+        results = serializer.save()
+        self.assertEqual([result['status'] for result in results], ['skipped', 'created'])
+
+    def test_csv_upload(self):
+        users = self.create_users(2)
+        upload = SimpleUploadedFile(
+            'members.csv',
+            f'email,role\n{users[0].email},Guest\n{users[1].email},\n'.encode(),
+            content_type='text/csv',
+        )
+        response = self.client.post(f'{self.url}csv/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        roles = dict(self.project.memberships.values_list('user_id', 'role__name'))
+        self.assertEqual(roles, {users[0].id: 'Guest', users[1].id: 'Member'})
+
+    def test_unknown_users_and_roles_are_reported(self):
+        users = self.create_users(1)
+        members = [
+            {'user': users[0].email},
+            {'user': 'nobody@example.com', 'role': 'Owner'},
+        ]
+        response = self.client.post(self.url, {'members': members}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['members'][0], {})
+        self.assertEqual(set(response.data['members'][1]), {'user', 'role'})
+        self.assertFalse(self.project.memberships.exists())
+
+    def test_only_the_creator_can_import(self):
+        outsider = self.create_users(1)[0]
+        Membership.objects.create(user=outsider, project=self.project, role=self.member_role)
+        self.client.force_authenticate(outsider)
+        response = self.client.post(self.url, {'members': [{'user': outsider.email}]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='seeker@example.com', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(
+            creator=self.user, title='Quarterly planning', description='Roadmap review')
+        self.task = Task.objects.create(
+            creator=self.user, title='Draft roadmap', description='Collect budget figures',
+            project=self.project)
+        self.comment = Comment.objects.create(task=self.task, user=self.user, text='Budget approved')
+        self.hidden = Task.objects.create(creator=self.other, title='Secret roadmap')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_results_are_ranked_and_visibility_filtered(self):
+        results = self.search('roadmap')
+        self.assertEqual(results[0], ('task', str(self.task.id)))
+        self.assertIn(('project', str(self.project.id)), results)
+        self.assertNotIn(('task', str(self.hidden.id)), results)
+
+        self.assertEqual(self.search('budg', type='comment'), [('comment', str(self.comment.id))])
+
+    def test_index_follows_changes(self):
+        self.task.title = 'Renamed item'
+        self.task.save()
+        self.assertEqual(self.search('renamed'), [('task', str(self.task.id))])
+
+        self.comment.delete()
+        self.assertEqual(self.search('approved'), [])
+        self.task.delete()
+        self.assertEqual(self.search('renamed'), [])
+
+    def test_long_project_titles_fit_the_index(self):
+        title = 'Long title ' + 'x' * 250
+        self.project.title = title
+        self.project.save()
+        entry = SearchEntry.objects.get(object_id=self.project.pk)
+        self.assertEqual(entry.title, title)
+        entry.full_clean()
+
+    def test_results_are_paginated(self):
+        for i in range(3):
+            Task.objects.create(creator=self.user, title=f'Sprint item {i}')
+        response = self.client.get('/api/search/', {'q': 'sprint', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='poller@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.task = Task.objects.create(creator=self.user, title='Task', project=self.project)
+        self.url = f'/api/tasks/{self.task.id}/?expand=subtasks,comments'
+
+    def test_unchanged_task_returns_304_before_serializing(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.client.get(f'/api/tasks/{self.task.id}/')['ETag'], etag)
+
+    def test_child_changes_change_the_etag(self):
+        etags = {self.client.get(self.url)['ETag']}
+        Subtask.objects.create(task=self.task, title='Subtask')
+        etags.add(self.client.get(self.url)['ETag'])
+        Comment.objects.create(task=self.task, user=self.user, text='Comment')
+        etags.add(self.client.get(self.url)['ETag'])
+        self.task.assignees.add(self.user)
+        etags.add(self.client.get(self.url)['ETag'])
+        self.assertEqual(len(etags), 4)
+
+    def test_if_match_guards_writes(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'title': 'First'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.url, {'title': 'Second'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(self.url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'First')
+
+    def test_project_etag_follows_tasks_and_members(self):
+        url = f'/api/project/{self.project.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Membership.objects.create(user=self.user, project=self.project, role=Role.objects.create(name='Member'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@example.com', password='password123')
+        self.other = User.objects.create_user(email='other@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.role = Role.objects.create(name='Member')
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.task = Task.objects.create(creator=self.user, title='Task', project=self.project)
+
+    def task_titles(self, **params):
+        response = self.client.get('/api/tasks/', params)
+        self.assertEqual(response.status_code, 200)
+        return [task['title'] for task in response.data['results']]
+
+    def test_repeated_reads_are_served_from_cache(self):
+        self.assertEqual(self.task_titles(), ['Task'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.task_titles(), ['Task'])
+        self.client.get('/api/projects/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/projects/')
+        self.assertEqual(self.task_titles(status='completed'), [])
+
+    def test_entries_are_scoped_to_the_user(self):
+        self.task_titles()
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.task_titles(), [])
+
+    def test_task_and_child_changes_invalidate_task_lists(self):
+        self.task_titles(expand='subtasks,comments')
+        Subtask.objects.create(task=self.task, title='Subtask')
+        response = self.client.get('/api/tasks/', {'expand': 'subtasks,comments'})
+        self.assertEqual(len(response.data['results'][0]['subtasks']), 1)
+        Comment.objects.create(task=self.task, user=self.user, text='Comment')
+        response = self.client.get('/api/tasks/', {'expand': 'subtasks,comments'})
+        self.assertEqual(len(response.data['results'][0]['comments']), 1)
+
+        self.task.title = 'Renamed'
+        self.task.save()
+        self.assertEqual(self.task_titles(), ['Renamed'])
+        self.task.delete()
+        self.assertEqual(self.task_titles(), [])
+
+    def test_access_changes_invalidate_only_affected_users(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.task_titles(), [])
+        self.task.assignees.add(self.other)
+        self.assertEqual(self.task_titles(), ['Task'])
+        self.task.assignees.remove(self.other)
+        self.assertEqual(self.task_titles(), [])
+
+        membership = Membership.objects.create(user=self.other, project=self.project, role=self.role)
+        self.assertEqual(self.task_titles(), ['Task'])
+        self.assertEqual(len(self.client.get('/api/projects/').data), 1)
+        membership.delete()
+        self.assertEqual(self.task_titles(), [])
+        self.assertEqual(len(self.client.get('/api/projects/').data), 0)
+
+        self.client.force_authenticate(self.user)
+        self.task_titles()
+        Task.objects.create(creator=self.other, title='Private')
+        with self.assertNumQueries(0):
+            self.task_titles()
+
+    def test_asset_lists_follow_their_owner_tags(self):
+        task_url = f'/api/tasks/{self.task.id}/assets/'
+        project_url = f'/api/projects/{self.project.id}/assets/'
+        self.assertEqual(len(self.client.get(task_url).data), 0)
+        self.assertEqual(len(self.client.get(project_url).data), 0)
+        asset = Asset.objects.create(task=self.task, uploaded_by=self.user, file='assets/spec.pdf')
+        self.assertEqual(len(self.client.get(task_url).data), 1)
+        with self.assertNumQueries(0):
+            self.client.get(project_url)
+        Asset.objects.create(project=self.project, uploaded_by=self.user, file='assets/plan.pdf')
+        self.assertEqual(len(self.client.get(project_url).data), 1)
+        asset.delete()
+        self.assertEqual(len(self.client.get(task_url).data), 0)
+
+
+class ProjectAccessTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='member@example.com', password='password123')
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.role = Role.objects.create(name='Admin')
+        self.joined = Project.objects.create(creator=self.owner, title='Joined')
+        self.owned = Project.objects.create(creator=self.user, title='Owned')
+        self.other = Project.objects.create(creator=self.owner, title='Other')
+        Membership.objects.create(user=self.user, project=self.joined, role=self.role)
+
+    def test_memberships_and_roles_are_loaded_once_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with self.assertNumQueries(2):
+            access = get_project_access(request)
+            access.load_creators([self.owned.id, self.other.id])
+            for _ in range(3):
+                self.assertTrue(access.is_member(self.joined.id))
+                self.assertTrue(access.is_member(str(self.joined.id)))
+                self.assertFalse(access.is_member(self.other.id))
+                self.assertEqual(access.membership(self.joined.id).role.name, 'Admin')
+                self.assertTrue(access.can_access(self.owned.id))
+                self.assertFalse(access.can_access(self.other.id))
+                self.assertFalse(access.is_member('not-a-uuid'))
+                self.assertFalse(access.is_creator('not-a-uuid'))
+            self.assertIs(get_project_access(request), access)
+        with self.assertNumQueries(0):
+            self.assertTrue(access.is_creator(self.owned))
+
+    def test_task_creation_requires_project_access(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for project, expected in [(self.joined, 201), (self.owned, 201), (self.other, 400)]:
+            response = client.post(
+                '/api/tasks/', {'title': 'Task', 'project': project.id, 'assignees': []},
+                format='json')
+            self.assertEqual(response.status_code, expected)
+        self.assertIn('project', response.data)
+
+
+class RecordingSubscription(Subscription):
+    def __init__(self):
+        self.channels = set()
+        self.events = []
+
+    def deliver(self, event):
+        self.events.append((event['type'], event['action']))
+
+
+class RealtimeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='owner@example.com', password='password123')
+        self.other = User.objects.create_user(email='helper@example.com', password='password123')
+        self.project = Project.objects.create(creator=self.user, title='Project')
+        self.hidden = Project.objects.create(creator=self.other, title='Hidden')
+        self.role = Role.objects.create(name='Member')
+        self.broker = get_broker()
+        self.project_events = self.subscribe(project_channel(self.project.id))
+        self.user_events = self.subscribe(user_channel(self.other.id))
+
+    def subscribe(self, channel):
+        subscription = RecordingSubscription()
+        self.broker.subscribe(subscription, channel)
+        self.addCleanup(self.broker.unsubscribe, subscription)
+        return subscription
+
+    def test_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            task = Task.objects.create(creator=self.user, title='Task', project=self.project)
+        self.assertEqual(self.project_events.events, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.project_events.events, [('task', 'created')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.other)
+            Subtask.objects.create(task=task, title='Subtask')
+            Comment.objects.create(task=task, user=self.user, text='Comment')
+            Asset.objects.create(task=task, uploaded_by=self.user, file='assets/spec.pdf')
+        expected = [('task', 'updated'), ('subtask', 'created'), ('comment', 'created'), ('asset', 'created')]
+        self.assertEqual(self.project_events.events[1:], expected)
+        self.assertEqual(self.user_events.events, expected)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.user_events.events[-1], ('task', 'deleted'))
+        self.assertEqual(self.project_events.events[-1], ('task', 'deleted'))
+
+    def test_membership_changes_reach_the_member(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            membership = Membership.objects.create(user=self.other, project=self.project, role=self.role)
+            membership.delete()
+        events = [('membership', 'created'), ('membership', 'deleted')]
+        self.assertEqual(self.user_events.events, events)
+        self.assertEqual(self.project_events.events, events)
+
+    async def connect(self, query):
+        communicator = ApplicationCommunicator(websocket_application, {
+            'type': 'websocket', 'path': '/ws/', 'query_string': query.encode()})
+        await communicator.send_input({'type': 'websocket.connect'})
+        return communicator, await communicator.receive_output(5)
+
+    async def exchange(self, communicator, message):
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(message)})
+        return json.loads((await communicator.receive_output(5))['text'])
+
+    async def test_websocket_rejects_missing_and_invalid_tokens(self):
+        for query in ['', 'token=invalid']:
+            communicator, message = await self.connect(query)
+            self.assertEqual(message, {'type': 'websocket.close', 'code': 4401})
+
+    async def test_websocket_streams_user_and_project_events(self):
+        communicator, message = await self.connect(f'token={AccessToken.for_user(self.user)}')
+        self.assertEqual(message['type'], 'websocket.accept')
+
+        reply = await self.exchange(communicator, {'action': 'subscribe', 'project': str(self.hidden.id)})
+        self.assertEqual(reply['type'], 'error')
+        reply = await self.exchange(communicator, {'action': 'subscribe', 'project': str(self.project.id)})
+        self.assertEqual(reply, {'type': 'subscribed', 'project': str(self.project.id)})
+
+        event = {'type': 'task', 'action': 'updated', 'id': 'task-id'}
+        self.broker.publish([project_channel(self.project.id), user_channel(self.user.id)], event)
+        self.assertEqual(json.loads((await communicator.receive_output(5))['text']), event)
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(5)
+        self.assertNotIn(user_channel(self.user.id), self.broker.subscribers)
+
+    async def test_revoked_members_leave_the_project_channel(self):
+        membership = await Membership.objects.acreate(user=self.other, project=self.project, role=self.role)
+        communicator, message = await self.connect(f'token={AccessToken.for_user(self.other)}')
+        reply = await self.exchange(communicator, {'action': 'subscribe', 'project': str(self.project.id)})
+        self.assertEqual(reply['type'], 'subscribed')
+
+        await membership.adelete()
+        revoked = {'type': 'membership', 'action': 'deleted', 'id': membership.pk,
+                   'project': str(self.project.id), 'user': str(self.other.id)}
+        self.broker.publish([project_channel(self.project.id), user_channel(self.other.id)], revoked)
+        self.broker.publish([project_channel(self.project.id)], {'type': 'task', 'action': 'created'})
+        self.assertEqual(json.loads((await communicator.receive_output(5))['text'])['action'], 'deleted')
+        reply = json.loads((await communicator.receive_output(5))['text'])
+        self.assertEqual(reply, {'type': 'unsubscribed', 'project': str(self.project.id)})
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(5)
+
+
+class ChangeLogTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(email='owner@example.com', password='password123')
+        self.member = User.objects.create_user(email='member@example.com', password='password123')
+        self.outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        self.project = Project.objects.create(creator=self.owner, title='Project')
+        self.membership = Membership.objects.create(
+            user=self.member, project=self.project, role=Role.objects.create(name='Member'))
+        self.task = Task.objects.create(creator=self.owner, title='Task', project=self.project)
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+        self.since = self.client.get('/api/changes/').data['since']
+
+    def changes(self, **params):
+        response = self.client.get('/api/changes/', {'since': self.since, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(change['type'], change['action']) for change in response.data['results']]
+
+    def test_only_visible_changes_are_returned_collapsed_per_object(self):
+        Task.objects.create(creator=self.outsider, title='Private')
+        for title in ('First', 'Second'):
+            self.task.title = title
+            self.task.save()
+        Subtask.objects.create(task=self.task, title='Subtask')
+        Comment.objects.create(task=self.task, user=self.owner, text='Comment')
+        self.assertEqual(self.changes(), [
+            ('task', 'upsert'), ('subtask', 'upsert'), ('comment', 'upsert')])
+
+    def test_deletes_leave_tombstones_for_cascaded_rows(self):
+        Subtask.objects.create(task=self.task, title='Subtask')
+        self.task.delete()
+        self.assertEqual(self.changes(), [('subtask', 'delete'), ('task', 'delete')])
+
+        self.since = self.client.get('/api/changes/').data['since']
+        other = Task.objects.create(creator=self.owner, title='Other', project=self.project)
+        self.project.delete()
+        self.assertCountEqual(self.changes(), [
+            ('task', 'delete'), ('membership', 'delete'), ('project', 'delete')])
+        self.assertFalse(Task.objects.filter(pk=other.pk).exists())
+
+    def test_removed_members_and_assignees_are_told_to_drop_objects(self):
+        private = Task.objects.create(creator=self.owner, title='Private')
+        private.assignees.add(self.member)
+        private.assignees.remove(self.member)
+        self.membership.delete()
+        self.assertEqual(self.changes(), [('task', 'revoke'), ('project', 'revoke')])
+
+    def test_changes_are_paged_by_sequence(self):
+        for index in range(3):
+            Comment.objects.create(task=self.task, user=self.owner, text=f'Comment {index}')
+        response = self.client.get('/api/changes/', {'since': self.since, 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(self.client.get('/api/changes/', {'since': 'x'}).status_code, 400)
+
+
+class ChangeLogAtomicityTests(TransactionTestCase):
+    def test_saves_roll_back_when_the_change_log_write_fails(self):
+        user = User.objects.create_user(email='owner@example.com', password='password123')
+        task = Task.objects.create(creator=user, title='Task')
+        task.title = 'Renamed'
+        with mock.patch.object(Change.objects, 'bulk_create', side_effect=DatabaseError('log')):
+            with self.assertRaises(DatabaseError):
+                task.save()
+        self.assertEqual(Task.objects.get(pk=task.pk).title, 'Task')
+
+    def test_concurrent_writers_are_flagged(self):
+        self.assertEqual(check_change_log_writers(None), [])
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertEqual([warning.id for warning in check_change_log_writers(None)], ['api.W001'])
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class AssetUploadTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='uploader@example.com', password='password123')
+        self.outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        self.task = Task.objects.create(creator=self.user, title='Task')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = b'0123456789' * 1000
+
+    def start(self, **fields):
+        return self.client.post('/api/assets/uploads/', {
+            'filename': 'notes.txt', 'size': len(self.data), 'task': self.task.pk, **fields,
+        }, format='json')
+
+    def put(self, pk, offset, chunk):
+        return self.client.put(
+            f'/api/assets/uploads/{pk}/', chunk,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_chunks_resume_from_the_received_offset_and_finalize_into_an_asset(self):
+        pk = self.start().data['id']
+        self.assertEqual(self.put(pk, 0, self.data[:4000]).data['offset'], 4000)
+        self.assertEqual(self.put(pk, 0, self.data[4000:]).status_code, 409)
+        self.assertEqual(self.client.get(f'/api/assets/uploads/{pk}/')['Upload-Offset'], '4000')
+        self.assertEqual(self.put(pk, 4000, self.data[4000:]).data['offset'], len(self.data))
+
+        response = self.client.post(f'/api/assets/uploads/{pk}/finalize/', {
+            'checksum': hashlib.sha256(self.data).hexdigest()}, format='json')
+        self.assertEqual(response.status_code, 201)
+        asset = Asset.objects.get(pk=response.data['id'])
+        self.assertEqual(asset.task, self.task)
+        with asset.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertFalse(AssetUpload.objects.exists())
+        self.assertEqual(list(Path(self.media_root, 'uploads').iterdir()), [])
+
+    def test_racing_chunks_and_finalizes_keep_the_winner(self):
+        pk = self.start().data['id']
+        stale = AssetUpload.objects.get(pk=pk)
+        self.assertEqual(self.put(pk, 0, self.data).status_code, 200)
+        self.assertIsNone(uploads.write_chunk(stale, 0, BytesIO(b'x' * 10)))
+        self.assertEqual(Path(self.media_root, 'uploads', f'{pk}.part').read_bytes(), self.data)
+
+        checksum = hashlib.sha256(self.data).hexdigest()
+        stale = AssetUpload.objects.get(pk=pk)
+        response = self.client.post(f'/api/assets/uploads/{pk}/finalize/', {'checksum': checksum}, format='json')
+        self.assertEqual(response.status_code, 201)
+        with self.assertRaises(uploads.UploadGone):
+            uploads.finalize(stale, checksum)
+        self.assertEqual(Asset.objects.count(), 1)
+
+    def test_bad_checksums_and_oversized_chunks_are_rejected(self):
+        pk = self.start(checksum='0' * 64).data['id']
+        self.assertEqual(self.put(pk, 0, self.data + b'extra').status_code, 400)
+        self.assertEqual(AssetUpload.objects.get(pk=pk).offset, 0)
+        self.assertEqual(self.client.post(f'/api/assets/uploads/{pk}/finalize/').status_code, 400)
+        self.put(pk, 0, self.data)
+        self.assertEqual(self.client.post(f'/api/assets/uploads/{pk}/finalize/').status_code, 400)
+        self.assertFalse(Asset.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/assets/uploads/{pk}/').status_code, 204)
+        self.assertEqual(list(Path(self.media_root, 'uploads').iterdir()), [])
+
+    def test_idle_uploads_expire_with_their_files(self):
+        stale, fresh = self.start().data['id'], self.start().data['id']
+        self.put(stale, 0, self.data[:10])
+        AssetUpload.objects.filter(pk=stale).update(expires_at=timezone.now())
+        self.assertEqual(self.put(stale, 10, self.data[10:]).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.start().status_code, 201)
+        self.assertFalse(AssetUpload.objects.filter(pk=stale).exists())
+        self.assertFalse(Path(self.media_root, 'uploads', f'{stale}.part').exists())
+
+        AssetUpload.objects.filter(pk=fresh).update(expires_at=timezone.now())
+        output = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('expire_uploads', stdout=output)
+        self.assertEqual(output.getvalue().strip(), 'Expired 1 upload(s).')
+        self.assertEqual(AssetUpload.objects.count(), 1)
+        self.assertEqual(len(list(Path(self.media_root, 'uploads').iterdir())), 1)
+
+    def test_uploads_need_a_visible_target_and_belong_to_the_uploader(self):
+        private = Task.objects.create(creator=self.outsider, title='Private')
+        self.assertEqual(self.start(task=private.pk).status_code, 400)
+        self.assertEqual(self.start(size=60 * 1024 * 1024).status_code, 400)
+        self.assertEqual(self.start(filename='script.exe').status_code, 400)
+        pk = self.start().data['id']
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.put(pk, 0, self.data).status_code, 404)
+
+
+class AssetStorageTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='uploader@example.com', password='password123')
+        self.tasks = [Task.objects.create(creator=self.user, title=f'Task {index}') for index in range(2)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, task, name, content=b'%PDF-1.4 spec'):
+        response = self.client.post('/api/assets/', {
+            'file': SimpleUploadedFile(name, content), 'task': task.pk}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        return Asset.objects.get(pk=response.data['id'])
+
+    def blobs(self):
+        return sorted(path.name for path in Path(self.media_root, 'assets').glob('??/*'))
+
+    def test_identical_files_are_stored_once_by_digest(self):
+        first = self.upload(self.tasks[0], 'spec.pdf')
+        second = self.upload(self.tasks[1], 'copy.pdf')
+        digest = hashlib.sha256(b'%PDF-1.4 spec').hexdigest()
+        self.assertEqual(first.file.name, f'assets/{digest[:2]}/{digest}')
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual((first.filename, second.filename), ('spec.pdf', 'copy.pdf'))
+        self.upload(self.tasks[1], 'other.pdf', b'other')
+        self.assertEqual(len(self.blobs()), 2)
+        self.assertEqual(list(Path(self.media_root, 'assets', 'tmp').iterdir()), [])
+
+    def test_blob_is_deleted_with_its_last_reference(self):
+        first = self.upload(self.tasks[0], 'spec.pdf')
+        self.upload(self.tasks[1], 'spec.pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/assets/{first.pk}/').status_code, 204)
+        self.assertEqual(len(self.blobs()), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tasks[1].delete()
+        self.assertEqual(self.blobs(), [])
+
+    def test_blob_reused_before_its_release_runs_is_kept(self):
+        first = self.upload(self.tasks[0], 'spec.pdf')
+        self.assertTrue(AssetBlob.objects.filter(name=first.file.name).exists())
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.delete()
+        second = self.upload(self.tasks[1], 'spec.pdf')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(len(self.blobs()), 1)
+        self.assertTrue(AssetBlob.objects.filter(name=second.file.name).exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.blobs(), [])
+        self.assertFalse(AssetBlob.objects.exists())
+
+    def test_replacing_a_file_releases_the_previous_blob(self):
+        asset = self.upload(self.tasks[0], 'spec.pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/assets/{asset.pk}/', {
+                'file': SimpleUploadedFile('v2.pdf', b'v2'), 'task': self.tasks[0].pk}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['filename'], 'v2.pdf')
+        self.assertEqual(self.blobs(), [hashlib.sha256(b'v2').hexdigest()])
+
+
+class AssetDownloadTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='uploader@example.com', password='password123')
+        self.outsider = User.objects.create_user(email='outsider@example.com', password='password123')
+        self.task = Task.objects.create(creator=self.user, title='Task')
+        self.content = b'0123456789abcdef'
+        self.asset = Asset.objects.create(
+            file=SimpleUploadedFile('report.pdf', self.content), task=self.task, uploaded_by=self.user)
+        self.url = f'/api/assets/{self.asset.pk}/download/'
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_file_is_streamed_with_validators_and_attachment_name(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="report.pdf"')
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/16')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'def')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=16-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */16')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_listed_assets_link_to_their_download(self):
+        response = self.client.get(f'/api/assets/list/?task={self.task.pk}')
+        self.assertEqual(response.status_code, 200)
+        download_url = response.data[0]['download_url']
+        self.assertEqual(download_url, f'http://testserver{self.url}')
+        response = self.client.get(download_url)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_only_visible_assets_can_be_downloaded(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_transfer_is_offloaded_to_the_proxy(self):
+        with self.settings(ASSET_SENDFILE='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.asset.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="report.pdf"')
+        with self.settings(ASSET_SENDFILE='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.asset.file.path)
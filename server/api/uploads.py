@@ -0,0 +1,137 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import partial
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Asset, AssetUpload, upload_expiry
+from .storage import HashedFile
+
+BLOCK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ChunkError(Exception):
+    pass
+
+
+class UploadGone(Exception):
+    pass
+
+
+def upload_dir():
+    return Path(getattr(settings, 'ASSET_UPLOAD_TEMP_DIR', Path(settings.MEDIA_ROOT) / 'uploads'))
+
+
+def part_path(upload):
+    return upload_dir() / f'{upload.pk}.part'
+
+
+def start(upload):
+    upload_dir().mkdir(parents=True, exist_ok=True)
+    part_path(upload).touch()
+
+
+def discard(path):
+    path.unlink(missing_ok=True)
+
+
+def expire():
+    """
+    Deletes the uploads past their expiry; their files are discarded once
+    the deletion commits (see signals.discard_upload). Returns the count.
+    """
+    return AssetUpload.objects.filter(expires_at__lte=timezone.now()).delete()[1].get(
+        AssetUpload._meta.label, 0)
+
+
+def receive(stream):
+    """
+    Reads a chunk from `stream` into a temporary file in fixed-size blocks,
+    so a slow client holds no lock. Returns the file, rewound.
+    """
+    staged = tempfile.TemporaryFile(dir=upload_dir())
+    written = 0
+    try:
+        for block in iter(partial(stream.read, BLOCK_SIZE), b''):
+            written += len(block)
+            if written > MAX_CHUNK_SIZE:
+                raise ChunkError(f'Chunks cannot exceed {MAX_CHUNK_SIZE} bytes.')
+            staged.write(block)
+    except BaseException:
+        staged.close()
+        raise
+    staged.seek(0)
+    return staged
+
+
+def write_chunk(upload, offset, stream):
+    """
+    Appends `stream` to the upload's file at `offset` and returns the new
+    offset, or None if another request moved the upload past `offset`
+    first. The chunk is received before the offset is claimed, and copied
+    into place in the same transaction, so only the winner of a race
+    writes, and a failed chunk leaves the file and offset as they were.
+    """
+    with receive(stream) as staged:
+        end = offset + os.fstat(staged.fileno()).st_size
+        if end > upload.size:
+            raise ChunkError('Chunk extends past the declared upload size.')
+        expires_at = upload_expiry()
+        with transaction.atomic():
+            if not AssetUpload.objects.filter(pk=upload.pk, offset=offset).update(
+                    offset=end, updated_at=timezone.now(), expires_at=expires_at):
+                return None
+            with open(part_path(upload), 'r+b') as part:
+                part.seek(offset)
+                try:
+                    shutil.copyfileobj(staged, part, BLOCK_SIZE)
+                except BaseException:
+                    part.truncate(offset)
+                    raise
+                part.truncate(end)
+    upload.offset, upload.expires_at = end, expires_at
+    return end
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(partial(part.read, BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize(upload, checksum):
+    """
+    Verifies the whole-file SHA-256 and turns the upload into an Asset. The
+    file is moved into storage under that digest and the row created in one
+    transaction, holding the blob's claim throughout; the stored file is
+    released again if the transaction fails. Raises UploadGone if another
+    request finalized or deleted the upload first.
+    """
+    path = part_path(upload)
+    try:
+        if file_checksum(path) != checksum:
+            raise ChunkError('Checksum does not match the uploaded data.')
+    except FileNotFoundError:
+        raise UploadGone()
+
+    asset = Asset(task=upload.task, project=upload.project, uploaded_by=upload.uploaded_by,
+                  filename=upload.filename)
+    try:
+        with transaction.atomic():
+            # Deleting the row claims the upload; a concurrent finalize
+            # waits for this transaction and then finds nothing to delete.
+            if not AssetUpload.objects.filter(pk=upload.pk).delete()[0]:
+                raise UploadGone()
+            with open(path, 'rb') as part:
+                asset.file.save(upload.filename, HashedFile(part, str(path), checksum), save=False)
+            asset.save()
+    except BaseException:
+        Asset.release_files(asset.file.name)
+        raise
+    return asset
@@ -3,16 +3,33 @@ from . import views
 
 urlpatterns = [
     path('tasks/', views.TasksAPIView.as_view(), name="tasks"),
+    path('tasks/bulk/', views.TaskBulkAPIView.as_view(), name="task-bulk"),
+    path('tasks/dashboard/', views.TaskDashboardAPIView.as_view(), name="task-dashboard"),
     path('tasks/<uuid:id>/', views.TaskActionAPIView.as_view(), name="task-details"),
     path('tasks/<uuid:task_id>/subtask/<uuid:subtask_id>/', views.SubtaskAPIView.as_view(), name='subtask-detail'),
+    path('tasks/<uuid:task_id>/comments/', views.TaskCommentListCreateAPIView.as_view(), name='task-comments'),
+    path('comments/<uuid:id>/', views.CommentAPIView.as_view(), name='comment-detail'),
+    path('comments/<uuid:id>/replies/', views.CommentRepliesAPIView.as_view(), name='comment-replies'),
     path('task/<uuid:task_id>/subtasks/', views.SubtaskListCreateAPIView.as_view(), name="subtasks"),
+    path('task/<uuid:task_id>/subtasks/bulk/', views.SubtaskBulkAPIView.as_view(), name="subtasks-bulk"),
     path('task/<uuid:task_id>/assignees/', views.TaskAssigneeAddAPIView.as_view(), name="add-assignee"),
     path("task/<uuid:task_id>/assignees/<uuid:user_id>/remove/", views.TaskAssigneeRemoveAPIView.as_view(), name="task-assignee-remove"),
     path('projects/', views.ProjectAPIView.as_view(), name="projects"),
     path('project/<uuid:id>/', views.ProjectActionAPIView.as_view(), name="project-action"),
+    path('project/<uuid:id>/tasks/', views.ProjectTasksAPIView.as_view(), name="project-tasks"),
+    path('project/<uuid:id>/stats/', views.ProjectStatsAPIView.as_view(), name="project-stats"),
+    path('project/<uuid:id>/members/', views.ProjectMembersAPIView.as_view(), name="project-members"),
+    path('project/<uuid:id>/members/import/', views.ProjectMembersImportAPIView.as_view(), name="project-members-import"),
+    path('project/<uuid:id>/members/import/csv/', views.ProjectMembersCSVImportAPIView.as_view(), name="project-members-import-csv"),
     path('assets/', views.AssetCreateAPIView.as_view(), name='asset-create'),
+    path('assets/uploads/', views.AssetUploadCreateAPIView.as_view(), name='asset-upload-create'),
+    path('assets/uploads/<uuid:pk>/', views.AssetUploadAPIView.as_view(), name='asset-upload'),
+    path('assets/uploads/<uuid:pk>/finalize/', views.AssetUploadFinalizeAPIView.as_view(), name='asset-upload-finalize'),
     path('assets/list/', views.AssetListAPIView.as_view(), name='asset-create'),
     path('assets/<uuid:pk>/', views.AssetDetailAPIView.as_view(), name='asset-detail'),
+    path('assets/<uuid:pk>/download/', views.AssetDownloadAPIView.as_view(), name='asset-download'),
     path('tasks/<uuid:task_id>/assets/', views.TaskAssetsListAPIView.as_view(), name='task-assets'),
     path('projects/<uuid:project_id>/assets/', views.ProjectAssetsListAPIView.as_view(), name='project-assets'),
+    path('search/', views.SearchAPIView.as_view(), name='search'),
+    path('changes/', views.ChangesAPIView.as_view(), name='changes'),
 ]
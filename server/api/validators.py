@@ -11,11 +11,18 @@ class IsTaskCreatorOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return True
-        return obj.creator == request.user
+        return obj.creator_id == request.user.id
+
+class IsCommentAuthorOrReadOnly(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        if request.method in ['GET', 'HEAD', 'OPTIONS']:
+            return True
+        return obj.user_id == request.user.id
+
+MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB in bytes
 
 def validate_file_size(file):
-    max_size = 50 * 1024 * 1024  # 50MB in bytes
-    if file.size > max_size:
+    if file.size > MAX_FILE_SIZE:
         raise ValidationError(f'File size cannot exceed 50MB. Current size: {file.size / 1024 / 1024:.1f}MB')
 
 def validate_file_type(file):
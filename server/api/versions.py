@@ -0,0 +1,42 @@
+from django.db.models import F
+from django.utils.http import parse_etags
+from .models import Task, Project
+from .response_cache import invalidate_tasks, invalidate_projects
+
+
+def touch(model, *pks):
+    pks = {pk for pk in pks if pk}
+    if pks:
+        model.objects.filter(pk__in=pks).update(version=F('version') + 1)
+
+
+def touch_tasks(*task_ids):
+    touch(Task, *task_ids)
+    invalidate_tasks(*task_ids)
+
+
+def touch_projects(*project_ids):
+    touch(Project, *project_ids)
+    invalidate_projects(*project_ids)
+
+
+def make_etag(version, variant):
+    return f'"{version}-{variant}"'
+
+
+def etag_version(etag):
+    return etag.removeprefix('W/').strip('"').split('-', 1)[0]
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or any(
+        candidate.removeprefix('W/') == etag for candidate in etags)
+
+
+def version_matches(header, version):
+    etags = parse_etags(header)
+    return '*' in etags or any(
+        etag_version(candidate) == str(version) for candidate in etags)
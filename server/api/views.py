@@ -1,49 +1,127 @@
+import csv
+import hashlib
+import io
+import uuid
 from django.contrib.auth import get_user_model
 from django.shortcuts import render
 from rest_framework import generics, status, serializers
-from .serializers import TaskSerializer, SubtaskSerializer, AssetSerializer, ProjectSerializer, MembershipSerializer
-from .models import Task, Subtask, Asset, Project, Membership
+from .serializers import (
+    TaskSerializer, SubtaskSerializer, AssetSerializer, AssetUploadSerializer, ProjectSerializer,
+    ProjectSummarySerializer, MembershipSerializer, CommentListSerializer,
+    BulkTaskSerializer, BulkSubtaskSerializer, BulkMembershipSerializer,
+    SearchResultSerializer, ChangeSerializer,
+)
+from .models import (
+    Task, Subtask, Asset, AssetUpload, Project, Membership, Comment, SearchEntry, Change,
+)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
-from django.db.models import Q
+from rest_framework.exceptions import APIException, ValidationError
+from django.db.models import Q, Prefetch
 from django.utils import timezone
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.db import models
-from .filters import TaskFilter, ProjectFilter
-from .validators import IsTaskCreatorOrReadOnly
+from .filters import TaskFilter, ProjectFilter, MembershipFilter, task_facets
+from .response_cache import (
+    cached_response, response_key, task_tag, project_tag, task_list_tag,
+    project_list_tag,
+)
+from .access import get_project_access
+from .changes import change_row, record
+from .search import get_search_backend
+from .stats import get_project_stats
+from .versions import touch_tasks, make_etag, etag_matches, version_matches
+from . import downloads, uploads
+from .pagination import (
+    TaskCursorPagination, CommentCursorPagination, ReplyCursorPagination,
+    MembershipCursorPagination,
+)
+from .validators import IsTaskCreatorOrReadOnly, IsCommentAuthorOrReadOnly
 from rest_framework.exceptions import NotFound
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
+from rest_framework.utils.urls import replace_query_param
 from users.serializers import UserSerializer
 
 
+class ExpandableFieldsViewMixin:
+    def get_query_list(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
 
-class TasksAPIView(generics.ListCreateAPIView):
+    def get_expand(self):
+        return self.get_query_list('expand') or set()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_query_list('fields')
+        context['expand'] = self.get_expand()
+        return context
+
+
+class TaskExpansionMixin(ExpandableFieldsViewMixin):
+    default_comment_depth = 5
+
+    def get_comment_depth(self):
+        try:
+            return max(0, int(self.request.query_params['comment_depth']))
+        except (KeyError, ValueError):
+            return self.default_comment_depth
+
+    def get_queryset(self):
+        return TaskSerializer.setup_eager_loading(
+            Task.objects.visible_to(self.request.user), self.get_expand())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['comment_depth'] = self.get_comment_depth()
+        return context
+
+
+class CachedListMixin:
+    """
+    Serves list responses from the shared response cache, keyed on the user
+    and the full query. Entries are dropped when any tag from
+    `get_cache_tags` is invalidated (see api/signals.py).
+    """
+
+    def get_cache_tags(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        response = None
+
+        def compute():
+            nonlocal response
+            response = super(CachedListMixin, self).list(request, *args, **kwargs)
+            return response.data if response.status_code == status.HTTP_200_OK else None
+
+        data, hit = cached_response(
+            response_key(type(self).__name__, request.user.pk, request),
+            self.get_cache_tags(),
+            compute,
+        )
+        return Response(data) if hit else response
+
+
+class TasksAPIView(CachedListMixin, TaskExpansionMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TaskSerializer
     filterset_class = TaskFilter
+    pagination_class = TaskCursorPagination
 
-    def get_queryset(self):
-        return (
-            Task.objects.filter(
-                models.Q(creator=self.request.user) |
-                models.Q(assignees__in=[self.request.user]) |
-                models.Q(project__members__in=[self.request.user])
-            )
-            .distinct()
-            .select_related('project', 'creator')
-            .prefetch_related('assignees')
-        )
+    def get_cache_tags(self):
+        return [task_list_tag(self.request.user.pk)]
 
     def perform_create(self, serializer):
         project = serializer.validated_data.get('project')
         if project:
-            if not (
-                project.members.filter(id=self.request.user.id).exists() or 
-                project.creator == self.request.user
-            ):
+            if not get_project_access(self.request).can_access(project):
                 raise serializers.ValidationError({
                     "project": "You must be a project member to create tasks in this project"
                 })
@@ -51,20 +129,189 @@ class TasksAPIView(generics.ListCreateAPIView):
 
 
 
-class TaskActionAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TaskBulkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkTaskSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class IntParamMixin:
+    def get_int_param(self, name, default, maximum=None):
+        try:
+            value = max(1, int(self.request.query_params[name]))
+        except (KeyError, ValueError):
+            return default
+        return min(value, maximum) if maximum else value
+
+
+class SearchAPIView(IntParamMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        invalid = set(kinds) - set(SearchEntry.KindChoices.values)
+        if invalid:
+            raise ValidationError({'type': f"Unknown types: {', '.join(sorted(invalid))}"})
+
+        page = self.get_int_param('page', 1)
+        page_size = self.get_int_param('page_size', self.page_size, self.max_page_size)
+        entries = get_search_backend().search(
+            request.user, query, kinds,
+            limit=page_size + 1, offset=(page - 1) * page_size)
+
+        url = request.build_absolute_uri()
+        return Response({
+            'next': replace_query_param(url, 'page', page + 1) if len(entries) > page_size else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'results': SearchResultSerializer(entries[:page_size], many=True).data,
+        })
+
+
+class ChangesAPIView(IntParamMixin, APIView):
+    """
+    Delta sync over the change log. Without `since` only the current head is
+    returned; clients then pass the `since` from each response to page
+    forward. Repeated changes to one object within a page collapse to the
+    latest.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 500
+    max_page_size = 1000
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is None:
+            head = Change.objects.aggregate(head=models.Max('seq'))['head'] or 0
+            return Response({'since': head, 'next': None, 'results': []})
+        try:
+            since = int(since)
+        except ValueError:
+            raise ValidationError({'since': 'Must be an integer.'})
+
+        page_size = self.get_int_param('page_size', self.page_size, self.max_page_size)
+        changes = list(
+            Change.objects.visible_to(request.user)
+            .filter(seq__gt=since).order_by('seq')[:page_size + 1]
+        )
+        has_more = len(changes) > page_size
+        changes = changes[:page_size]
+        if changes:
+            since = changes[-1].seq
+
+        latest = {}
+        for entry in changes:
+            latest.pop((entry.kind, entry.object_id), None)
+            latest[(entry.kind, entry.object_id)] = entry
+
+        url = request.build_absolute_uri()
+        return Response({
+            'since': since,
+            'next': replace_query_param(url, 'since', since) if has_more else None,
+            'results': ChangeSerializer(latest.values(), many=True).data,
+        })
+
+
+class TaskDashboardAPIView(TaskExpansionMixin, generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskSerializer
+    bucket_size = 5
+    max_bucket_size = 50
+
+    def get_bucket_size(self):
+        try:
+            size = int(self.request.query_params['page_size'])
+        except (KeyError, ValueError):
+            return self.bucket_size
+        return max(1, min(size, self.max_bucket_size))
+
+    def get(self, request, *args, **kwargs):
+        visible = self.get_queryset()
+        facets = task_facets(request.user)
+
+        counts = visible.order_by().aggregate(
+            total=models.Count('id'),
+            **{name: models.Count('id', filter=condition) for name, condition in facets.items()}
+        )
+
+        buckets = {}
+        for name, condition in facets.items():
+            paginator = TaskCursorPagination()
+            paginator.base_url = request.build_absolute_uri(
+                f"{reverse('tasks')}?{urlencode({name: 'true'})}")
+            page = paginator.get_page(visible.filter(condition), self.get_bucket_size())
+            buckets[name] = {
+                'next': paginator.next_url,
+                'results': self.get_serializer(page, many=True).data,
+            }
+
+        return Response({'counts': counts, 'buckets': buckets})
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has changed since it was fetched.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalObjectMixin:
+    """
+    Strong ETags for detail views, built from the object's `version` column and
+    a hash of the query string. GET honours If-None-Match before any
+    serialization; PUT, PATCH and DELETE honour If-Match.
+    """
+
+    def get_version_queryset(self):
+        raise NotImplementedError
+
+    def get_etag_variant(self):
+        query = self.request.META.get('QUERY_STRING', '')
+        return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()[:12]
+
+    def get_etag(self, refresh=False):
+        if refresh or not hasattr(self, '_version'):
+            self._version = get_object_or_404(
+                self.get_version_queryset().values_list('version', flat=True),
+                pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            )
+        return make_etag(self._version, self.get_etag_variant())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if_match = request.headers.get('If-Match')
+        if if_match and request.method in ('PUT', 'PATCH', 'DELETE'):
+            self.get_etag()
+            if not version_matches(if_match, self._version):
+                raise PreconditionFailed()
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.get_etag(refresh=True)
+        return response
+
+
+class TaskActionAPIView(ConditionalObjectMixin, TaskExpansionMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsTaskCreatorOrReadOnly]
     serializer_class = TaskSerializer
     lookup_field = 'id'
-    
-    def get_queryset(self):
-        return Task.objects.filter(
-            models.Q(creator=self.request.user) |
-            models.Q(assignees__in=[self.request.user]) |
-            models.Q(project__members__in=[self.request.user])
-        ).distinct()
 
-    def get_serializer_context(self):
-        return {'request': self.request}
+    def get_version_queryset(self):
+        return Task.objects.visible_to(self.request.user)
 
     def perform_update(self, serializer):
         serializer.save()
@@ -85,11 +332,7 @@ class TaskAssigneeAddAPIView(generics.ListCreateAPIView):
     def get_task(self):
         task_id = self.kwargs.get("task_id")
         task = get_object_or_404(
-            Task.objects.filter(
-                models.Q(creator=self.request.user) |
-                models.Q(assignees__in=[self.request.user]) |
-                models.Q(project__members__in=[self.request.user])
-            ).distinct(),
+            Task.objects.visible_to(self.request.user).select_related('project'),
             id=task_id
         )
         return task
@@ -113,30 +356,49 @@ class TaskAssigneeAddAPIView(generics.ListCreateAPIView):
         if not assignees or not isinstance(assignees, list):
             raise ValidationError({"assignees": "This field must be a list of user IDs."})
 
-        from django.contrib.auth import get_user_model
+        if task.creator_id != request.user.id and (
+            not task.project or not get_project_access(request).is_creator(task.project)
+        ):
+            raise PermissionDenied("Only the task creator or project creator can add assignees.")
+
         User = get_user_model()
 
-        added_users = []
-        for user_id in assignees:
-            user = get_object_or_404(User, id=user_id)
-
-            if task.creator != request.user and (
-                not task.project or task.project.creator != request.user
-            ):
-                raise PermissionDenied("Only the task creator or project creator can add assignees.")
-            
-            if task.project and not task.project.members.filter(id=user.id).exists():
-                raise ValidationError({
-                    "assignees": f"User '{user.username}' must be a member of the project to be assigned."
-                })
+        errors = []
+        user_ids = []
+        for value in assignees:
+            try:
+                user_id = uuid.UUID(str(value))
+            except ValueError:
+                errors.append(f"'{value}' is not a valid user ID.")
+                continue
+            if user_id not in user_ids:
+                user_ids.append(user_id)
+
+        users = User.objects.in_bulk(user_ids)
+        errors += [
+            f"User '{user_id}' does not exist."
+            for user_id in user_ids if user_id not in users
+        ]
+
+        if task.project_id:
+            member_ids = set(
+                Membership.objects.filter(
+                    project_id=task.project_id, user_id__in=users
+                ).values_list('user_id', flat=True)
+            )
+            errors += [
+                f"User '{user.username}' must be a member of the project to be assigned."
+                for user_id, user in users.items() if user_id not in member_ids
+            ]
 
-            task.assignees.add(user)
-            added_users.append(user.username)
+        if errors:
+            raise ValidationError({"assignees": errors})
 
-        task.save()
+        added_users = [users[user_id] for user_id in user_ids]
+        task.assignees.add(*added_users)
 
         return Response(
-            {"detail": f"Added assignees: {', '.join(added_users)}"},
+            {"detail": f"Added assignees: {', '.join(user.username for user in added_users)}"},
             status=status.HTTP_201_CREATED
         )
 
@@ -146,18 +408,16 @@ class TaskAssigneeRemoveAPIView(APIView):
 
     def delete(self, request, task_id, user_id):
         task = get_object_or_404(
-            Task.objects.filter(
-                models.Q(creator=request.user) |
-                models.Q(assignees__in=[request.user]) |
-                models.Q(project__members__in=[request.user])
-            ).distinct(),
+            Task.objects.visible_to(request.user),
             id=task_id
         )
 
         User = get_user_model()
         user = get_object_or_404(User, id=user_id)
 
-        if task.creator != request.user and (not task.project or task.project.creator != request.user):
+        if task.creator_id != request.user.id and (
+            not task.project_id or not get_project_access(request).is_creator(task.project_id)
+        ):
             raise PermissionDenied("Only the task creator or project creator can remove assignees.")
 
         if user not in task.assignees.all():
@@ -165,13 +425,18 @@ class TaskAssigneeRemoveAPIView(APIView):
 
         task.assignees.remove(user)
         
-        subtasks_updated = task.subtasks.filter(assigned_to=user).update(
+        unassigned = list(task.subtasks.filter(assigned_to=user).only('id', 'task_id'))
+        subtasks_updated = Subtask.objects.filter(
+            pk__in=[subtask.pk for subtask in unassigned]
+        ).update(
             assigned_to=None,
             is_completed=False
         )
         
         response_message = f"{user.username} removed from assignees."
         if subtasks_updated > 0:
+            touch_tasks(task.pk)
+            record([change_row(subtask) for subtask in unassigned])
             response_message += f" {subtasks_updated} subtask(s) have been unassigned."
         
         return Response({"detail": response_message}, status=200)
@@ -180,19 +445,16 @@ class TaskAssigneeRemoveAPIView(APIView):
 class SubtaskAPIView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = SubtaskSerializer
-    
 
     def get_object(self):
-        task = get_object_or_404(
-            Task.objects.filter(
-                (
-                    models.Q(creator=self.request.user) |
-                    models.Q(assignees__in=[self.request.user]) |
-                    models.Q(project__members__in=[self.request.user])
-                ) & models.Q(id=self.kwargs['task_id'])
-            ).distinct()
-        )
-        return get_object_or_404(Subtask, id=self.kwargs['subtask_id'], task=task)
+        if not hasattr(self, '_subtask'):
+            self._subtask = get_object_or_404(
+                Subtask.objects.select_related('task', 'assigned_to').filter(
+                    task__in=Task.objects.visible_to(self.request.user)),
+                id=self.kwargs['subtask_id'],
+                task_id=self.kwargs['task_id']
+            )
+        return self._subtask
 
     def get_serializer_context(self):
         return {
@@ -202,12 +464,12 @@ class SubtaskAPIView(generics.RetrieveUpdateDestroyAPIView):
 
     def perform_update(self, serializer):
         subtask = self.get_object()
-        
-        if (subtask.assigned_to and 
-            subtask.assigned_to != self.request.user and 
-            subtask.task.creator != self.request.user):
+
+        if (subtask.assigned_to_id and
+            subtask.assigned_to_id != self.request.user.id and
+            subtask.task.creator_id != self.request.user.id):
             raise PermissionDenied("You can only update your own subtasks or if you're the task creator")
-        
+
         serializer.save()
 
 class SubtaskListCreateAPIView(generics.ListCreateAPIView):
@@ -216,40 +478,126 @@ class SubtaskListCreateAPIView(generics.ListCreateAPIView):
 
     def get_task(self):
         return get_object_or_404(
-            Task.objects.filter(
-                (
-                    models.Q(creator=self.request.user) |
-                    models.Q(assignees__in=[self.request.user]) |
-                    models.Q(project__members__in=[self.request.user])
-                ) & models.Q(id=self.kwargs['task_id'])
-            ).distinct()
+            Task.objects.visible_to(self.request.user),
+            id=self.kwargs['task_id']
         )
 
     def get_queryset(self):
         task = self.get_task()
-        return Subtask.objects.filter(task=task).order_by("created_at")
+        return Subtask.objects.filter(task=task).order_by("position", "created_at")
 
     def perform_create(self, serializer):
         task = self.get_task()
-        serializer.save(task=task)
+        position = serializer.validated_data.get('position')
+        if position is None:
+            last = task.subtasks.aggregate(last=models.Max('position'))['last']
+            position = 0 if last is None else last + 1
+        serializer.save(task=task, position=position)
+
+class SubtaskBulkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, task_id):
+        task = get_object_or_404(Task.objects.visible_to(request.user), id=task_id)
+        serializer = BulkSubtaskSerializer(
+            data=request.data, context={'request': request, 'task': task})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+class TaskCommentListCreateAPIView(generics.ListCreateAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = CommentListSerializer
+    pagination_class = CommentCursorPagination
+
+    def get_task(self):
+        if not hasattr(self, '_task'):
+            self._task = get_object_or_404(
+                Task.objects.visible_to(self.request.user),
+                id=self.kwargs['task_id']
+            )
+        return self._task
+
+    def get_queryset(self):
+        return (
+            Comment.objects.filter(task=self.get_task(), parent__isnull=True)
+            .select_related('user')
+            .annotate(num_replies=models.Count('replies'))
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['task'] = self.get_task()
+        return context
+
+    def perform_create(self, serializer):
+        serializer.save(task=self.get_task(), user=self.request.user)
+
+
+class CommentAPIView(generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAuthenticated, IsCommentAuthorOrReadOnly]
+    serializer_class = CommentListSerializer
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        return (
+            Comment.objects.filter(task__in=Task.objects.visible_to(self.request.user))
+            .select_related('user')
+            .annotate(num_replies=models.Count('replies'))
+        )
+
+    def perform_update(self, serializer):
+        serializer.save(parent=serializer.instance.parent)
 
-class ProjectAPIView(generics.ListCreateAPIView):
+
+class CommentRepliesAPIView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = CommentListSerializer
+    pagination_class = ReplyCursorPagination
+
+    def get_queryset(self):
+        parent = get_object_or_404(
+            Comment.objects.filter(task__in=Task.objects.visible_to(self.request.user)),
+            id=self.kwargs['id']
+        )
+        return (
+            Comment.objects.filter(parent=parent)
+            .select_related('user')
+            .annotate(num_replies=models.Count('replies'))
+        )
+
+
+class ProjectAPIView(CachedListMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectSerializer
 
     filterset_class = ProjectFilter
-    
+
+    def get_cache_tags(self):
+        return [project_list_tag(self.request.user.pk)]
+
     def get_queryset(self):
-        return Project.objects.filter(
-            models.Q(members__in=[self.request.user]) |
-            models.Q(creator=self.request.user)
-        ).distinct()
+        return (
+            Project.objects.visible_to(self.request.user)
+            .with_summary()
+            .select_related('creator')
+        )
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ProjectSummarySerializer
+        return ProjectSerializer
 
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
 
-class ProjectActionAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Project.objects.all()
+class ProjectActionAPIView(ConditionalObjectMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = (
+        Project.objects.with_summary()
+        .with_member_preview()
+        .select_related('creator')
+        .prefetch_related(Prefetch('assets', queryset=Asset.objects.select_related('uploaded_by')))
+    )
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
@@ -260,6 +608,91 @@ class ProjectActionAPIView(generics.RetrieveUpdateDestroyAPIView):
         except Project.DoesNotExist:
             raise NotFound("Project not found")
 
+    def get_version_queryset(self):
+        return Project.objects.all()
+
+    def get_etag_variant(self):
+        return f"{super().get_etag_variant()}-{timezone.now().date():%Y%m%d}"
+
+
+class ProjectChildMixin:
+    def get_project(self):
+        if not hasattr(self, '_project'):
+            self._project = get_object_or_404(
+                Project.objects.visible_to(self.request.user),
+                id=self.kwargs['id']
+            )
+        return self._project
+
+
+class ProjectTasksAPIView(ProjectChildMixin, TaskExpansionMixin, generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskSerializer
+    filterset_class = TaskFilter
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        return TaskSerializer.setup_eager_loading(
+            Task.objects.filter(project=self.get_project()), self.get_expand())
+
+
+class ProjectStatsAPIView(ProjectChildMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        return Response(get_project_stats(self.get_project()))
+
+
+class ProjectMembersAPIView(ProjectChildMixin, generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = MembershipSerializer
+    pagination_class = MembershipCursorPagination
+    filterset_class = MembershipFilter
+
+    def get_queryset(self):
+        return Membership.objects.filter(
+            project=self.get_project()).select_related('user', 'role')
+
+
+class ProjectMembersImportAPIView(ProjectChildMixin, APIView):
+    permission_classes = [IsAuthenticated, IsTaskCreatorOrReadOnly]
+
+    def get_members(self, request):
+        if isinstance(request.data, list):
+            return request.data
+        return request.data.get('members')
+
+    def post(self, request, id):
+        project = self.get_project()
+        self.check_object_permissions(request, project)
+        serializer = BulkMembershipSerializer(
+            data={'members': self.get_members(request)},
+            context={'request': request, 'project': project}
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class ProjectMembersCSVImportAPIView(ProjectMembersImportAPIView):
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_members(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'A CSV file is required.'})
+        try:
+            rows = csv.DictReader(io.TextIOWrapper(upload.file, encoding='utf-8-sig'))
+            members = []
+            for row in rows:
+                member = {'user': row.get('user') or row.get('email') or row.get('user_id')}
+                if row.get('role'):
+                    member['role'] = row['role']
+                members.append(member)
+        except (UnicodeDecodeError, csv.Error):
+            raise ValidationError({'file': 'The file is not a valid UTF-8 CSV.'})
+        return members
+
 
 class AssetCreateAPIView(generics.CreateAPIView):
     queryset = Asset.objects.all()
@@ -270,6 +703,95 @@ class AssetCreateAPIView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(uploaded_by=self.request.user)
 
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Upload-Offset does not match the bytes received so far.'
+    default_code = 'conflict'
+
+
+class AssetUploadMixin:
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self):
+        return get_object_or_404(
+            AssetUpload.objects.select_related('task', 'project'),
+            pk=self.kwargs['pk'], uploaded_by=self.request.user, expires_at__gt=timezone.now(),
+        )
+
+    def upload_response(self, upload, status_code=status.HTTP_200_OK):
+        return Response(
+            AssetUploadSerializer(upload).data, status=status_code,
+            headers={'Upload-Offset': str(upload.offset)},
+        )
+
+
+class AssetUploadCreateAPIView(AssetUploadMixin, APIView):
+    """
+    Starts a resumable upload. The file is then sent in chunks with PUT to
+    assets/uploads/<id>/ and turned into an Asset with POST to .../finalize/.
+    Uploads abandoned past their expiry are swept out here as well.
+    """
+
+    def post(self, request):
+        serializer = AssetUploadSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        uploads.expire()
+        upload = serializer.save(uploaded_by=request.user)
+        uploads.start(upload)
+        return self.upload_response(upload, status.HTTP_201_CREATED)
+
+
+class AssetUploadAPIView(AssetUploadMixin, APIView):
+    """
+    GET reports how many bytes were received, so an interrupted client knows
+    where to resume. PUT appends the raw request body at the Upload-Offset
+    header, which must equal that count. DELETE abandons the upload.
+    """
+
+    def get(self, request, pk):
+        return self.upload_response(self.get_upload())
+
+    def put(self, request, pk):
+        upload = self.get_upload()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            raise ValidationError({'Upload-Offset': 'An integer byte offset is required.'})
+        if offset != upload.offset:
+            raise UploadConflict(f'Expected Upload-Offset {upload.offset}.')
+
+        try:
+            end = uploads.write_chunk(upload, offset, request._request)
+        except uploads.ChunkError as error:
+            raise ValidationError({'detail': str(error)})
+        if end is None:
+            # A concurrent request for the same offset won.
+            raise UploadConflict()
+        return self.upload_response(upload)
+
+    def delete(self, request, pk):
+        self.get_upload().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AssetUploadFinalizeAPIView(AssetUploadMixin, APIView):
+
+    def post(self, request, pk):
+        upload = self.get_upload()
+        if upload.offset != upload.size:
+            raise ValidationError({'detail': f'Only {upload.offset} of {upload.size} bytes were received.'})
+        checksum = str(request.data.get('checksum') or upload.checksum).lower()
+        if not checksum:
+            raise ValidationError({'checksum': 'A SHA-256 checksum of the file is required.'})
+        try:
+            asset = uploads.finalize(upload, checksum)
+        except uploads.ChunkError as error:
+            raise ValidationError({'checksum': str(error)})
+        except uploads.UploadGone:
+            raise NotFound()
+        return Response(AssetSerializer(asset).data, status=status.HTTP_201_CREATED)
+
+
 class AssetListAPIView(generics.ListAPIView):
     queryset = Asset.objects.all()
     serializer_class = AssetSerializer
@@ -296,26 +818,45 @@ class AssetDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return get_object_or_404(Asset, id=self.kwargs['pk'])
 
-    def destroy(self, request, *args, **kwargs):
-        asset = self.get_object()
-        if asset.file:
-            asset.file.delete(save=False)
-        asset.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
 
-class TaskAssetsListAPIView(generics.ListAPIView):
+class AssetDownloadAPIView(APIView):
+    """
+    Sends an asset's file to anyone who can see its task or project, with
+    Range, conditional request and X-Accel-Redirect/X-Sendfile support (see
+    api/downloads.py).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        user = request.user
+        asset = get_object_or_404(
+            Asset.objects.filter(
+                Q(task__in=Task.objects.visible_to(user))
+                | Q(project__in=Project.objects.visible_to(user))
+            ),
+            pk=pk,
+        )
+        return downloads.serve(request, asset)
+
+class TaskAssetsListAPIView(CachedListMixin, generics.ListAPIView):
     serializer_class = AssetSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_cache_tags(self):
+        return [task_tag(self.kwargs['task_id'])]
+
     def get_queryset(self):
         task_id = self.kwargs['task_id']
         task = get_object_or_404(Task, id=task_id)
         return Asset.objects.filter(task=task)
 
-class ProjectAssetsListAPIView(generics.ListAPIView):
+class ProjectAssetsListAPIView(CachedListMixin, generics.ListAPIView):
     serializer_class = AssetSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_cache_tags(self):
+        return [project_tag(self.kwargs['project_id'])]
+
     def get_queryset(self):
         project_id = self.kwargs['project_id']
         project = get_object_or_404(Project, id=project_id)
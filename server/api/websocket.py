@@ -0,0 +1,152 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from .access import as_uuid
+from .models import Project
+from .realtime import Subscription, get_broker, project_channel, revoked_project, user_channel
+
+UNAUTHORIZED = 4401
+
+
+def database(func):
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(wrapper)
+
+
+@database
+def authenticate(token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+@database
+def can_subscribe(user, project_id):
+    return Project.objects.visible_to(user).filter(pk=project_id).exists()
+
+
+class MemberSubscription(Subscription):
+    """
+    A connection's subscription, which leaves a project channel as soon as
+    its user's membership of the project is deleted, so no later event of
+    the project is delivered. The connection then re-checks access, since the
+    user may still see the project, e.g. as its creator.
+    """
+
+    def __init__(self, broker, user_id):
+        super().__init__()
+        self.broker = broker
+        self.user_id = user_id
+        self.revoked = set()
+
+    def deliver(self, event):
+        # Runs in the publishing thread, before the broker targets anything
+        # published after this event.
+        project_id = revoked_project(event, self.user_id)
+        if project_id is not None and project_channel(project_id) in self.channels:
+            self.broker.unsubscribe(self, project_channel(project_id))
+            self.revoked.add(project_id)
+        super().deliver(event)
+
+
+class RealtimeConnection:
+    """
+    WebSocket endpoint at /ws/?token=<access token>. The connection is
+    subscribed to the caller's user channel; clients send
+    {"action": "subscribe" | "unsubscribe", "project": "<id>"} for project
+    channels and receive compact change events as JSON. A project channel is
+    left when the user's membership is revoked and access is lost.
+    """
+
+    def __init__(self, scope, receive, send):
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.broker = get_broker()
+
+    async def send_json(self, data):
+        await self.send({'type': 'websocket.send', 'text': json.dumps(data, cls=DjangoJSONEncoder)})
+
+    async def connect(self):
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        token = query.get('token', [''])[0]
+        self.user = await authenticate(token) if token else None
+        if self.user is None:
+            await self.send({'type': 'websocket.close', 'code': UNAUTHORIZED})
+            return False
+        await self.send({'type': 'websocket.accept'})
+        self.subscription = MemberSubscription(self.broker, self.user.pk)
+        self.broker.subscribe(self.subscription, user_channel(self.user.pk))
+        return True
+
+    async def handle(self, text):
+        try:
+            message = json.loads(text or '')
+            action, project_id = message.get('action'), as_uuid(message.get('project'))
+        except (ValueError, AttributeError):
+            return await self.send_json({'type': 'error', 'detail': 'Invalid message'})
+
+        if action == 'subscribe':
+            if project_id is None or not await can_subscribe(self.user, project_id):
+                return await self.send_json({'type': 'error', 'detail': 'Project not found'})
+            self.broker.subscribe(self.subscription, project_channel(project_id))
+            await self.send_json({'type': 'subscribed', 'project': project_id})
+        elif action == 'unsubscribe' and project_id is not None:
+            self.broker.unsubscribe(self.subscription, project_channel(project_id))
+            await self.send_json({'type': 'unsubscribed', 'project': project_id})
+        else:
+            await self.send_json({'type': 'error', 'detail': 'Unknown action'})
+
+    async def recheck_revoked(self):
+        while self.subscription.revoked:
+            project_id = self.subscription.revoked.pop()
+            if await can_subscribe(self.user, project_id):
+                self.broker.subscribe(self.subscription, project_channel(project_id))
+            else:
+                await self.send_json({'type': 'unsubscribed', 'project': project_id})
+
+    async def run(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect' or not await self.connect():
+            return
+
+        incoming = asyncio.ensure_future(self.receive())
+        outgoing = asyncio.ensure_future(self.subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {incoming, outgoing}, return_when=asyncio.FIRST_COMPLETED)
+                if outgoing in done:
+                    await self.send_json(outgoing.result())
+                    await self.recheck_revoked()
+                    outgoing = asyncio.ensure_future(self.subscription.get())
+                if incoming in done:
+                    message = incoming.result()
+                    if message['type'] == 'websocket.disconnect':
+                        break
+                    await self.handle(message.get('text'))
+                    incoming = asyncio.ensure_future(self.receive())
+        finally:
+            incoming.cancel()
+            outgoing.cancel()
+            self.broker.unsubscribe(self.subscription)
+
+
+async def websocket_application(scope, receive, send):
+    if scope.get('path', '').rstrip('/') != '/ws':
+        await receive()
+        await send({'type': 'websocket.close'})
+        return
+    await RealtimeConnection(scope, receive, send).run()
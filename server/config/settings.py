@@ -207,6 +207,22 @@ DATABASES = {
     }
 }
 
+# Shared between worker processes so cached responses and their invalidation
+# tags are seen by every worker. For a database-backed cache set CACHE_BACKEND
+# to django.core.cache.backends.db.DatabaseCache, CACHE_LOCATION to a table
+# name, and run `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000))},
+    }
+}
+
+# Keeps test runs off the on-disk cache above (see config/test_runner.py).
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -247,6 +263,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Asset downloads are handed to the front proxy when set to 'x-accel-redirect'
+# (nginx, with an internal location at ASSET_ACCEL_REDIRECT_PREFIX aliased to
+# MEDIA_ROOT) or 'x-sendfile'; otherwise Django streams the file itself.
+ASSET_SENDFILE = os.getenv('ASSET_SENDFILE', '')
+ASSET_ACCEL_REDIRECT_PREFIX = os.getenv('ASSET_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Seconds a resumable upload may sit idle before it and its partial file are
+# deleted (on the next new upload, or by `manage.py expire_uploads`).
+ASSET_UPLOAD_EXPIRY = int(os.getenv('ASSET_UPLOAD_EXPIRY', 24 * 60 * 60))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:57
+
+import re
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of users.models.search_tokens as of this migration, so the
+# backfill does not change when the live tokenizer does.
+def search_tokens(username, email, first_name, last_name):
+    full_name = ' '.join(part for part in (first_name, last_name) if part)
+    tokens = {}
+    for value in (username, email, full_name):
+        value = ' '.join((value or '').lower().split())[:100]
+        if not value:
+            continue
+        tokens[value] = True
+        for word in re.split(r'[\s@._+-]+', value):
+            if word:
+                tokens.setdefault(word, False)
+    return tokens
+
+
+def backfill_search_tokens(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserSearchToken = apps.get_model('users', 'UserSearchToken')
+    rows = User.objects.values_list('id', 'username', 'email', 'first_name', 'last_name')
+    UserSearchToken.objects.bulk_create(
+        (
+            UserSearchToken(user_id=user_id, token=token, is_primary=is_primary)
+            for user_id, *fields in rows.iterator()
+            for token, is_primary in search_tokens(*fields).items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customemaildevice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('is_primary', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'user', 'is_primary'], name='user_search_token_idx'), models.Index(fields=['user', 'token', 'is_primary'], name='user_search_owner_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_tokens, migrations.RunPython.noop),
+    ]
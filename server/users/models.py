@@ -124,3 +124,86 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'user'
         verbose_name_plural = 'users'
         ordering = ['-date_joined']
+
+
+SEARCH_TOKEN_LENGTH = 100
+SEARCH_TOKEN_END = '\U0010ffff'
+
+
+def normalize_search_query(value):
+    return ' '.join(value.lower().split())[:SEARCH_TOKEN_LENGTH]
+
+
+def search_tokens(username, email, first_name, last_name):
+    """
+    Returns {token: is_primary}. Primary tokens are whole values (username,
+    email, full name); the rest are the words inside them.
+    """
+    full_name = ' '.join(part for part in (first_name, last_name) if part)
+    tokens = {}
+    for value in (username, email, full_name):
+        value = normalize_search_query(value or '')
+        if not value:
+            continue
+        tokens[value] = True
+        for word in re.split(r'[\s@._+-]+', value):
+            if word:
+                tokens.setdefault(word, False)
+    return tokens
+
+
+class UserSearchTokenManager(models.Manager):
+    def rebuild(self, users):
+        users = list(users)
+        self.filter(user__in=users).delete()
+        self.bulk_create([
+            UserSearchToken(user=user, token=token, is_primary=is_primary)
+            for user in users
+            for token, is_primary in search_tokens(
+                user.username, user.email, user.first_name, user.last_name).items()
+        ])
+
+    def ranked_user_ids(self, query, limit=20, candidates=200, **filters):
+        query = normalize_search_query(query)
+        if not query:
+            return []
+        rows = (
+            self.filter(token__gte=query, token__lt=query + SEARCH_TOKEN_END, **filters)
+            .order_by('token')
+            .values_list('user_id', 'token', 'is_primary')[:candidates]
+        )
+        ranks = {}
+        for user_id, token, is_primary in rows:
+            rank = (0 if token == query else 1 if is_primary else 2, token)
+            if user_id not in ranks or rank < ranks[user_id]:
+                ranks[user_id] = rank
+        if len(ranks) < limit:
+            # Substrings of whole values ("smith" in "blacksmith@…") rank
+            # last. They cannot use the index, so only fill a short list.
+            rows = (
+                self.filter(is_primary=True, token__contains=query, **filters)
+                .exclude(user_id__in=list(ranks))
+                .order_by('token')
+                .values_list('user_id', 'token')[:candidates]
+            )
+            for user_id, token in rows:
+                ranks.setdefault(user_id, (3, token))
+        return sorted(ranks, key=ranks.get)[:limit]
+
+
+class UserSearchToken(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='search_tokens', db_index=False)
+    token = models.CharField(max_length=SEARCH_TOKEN_LENGTH)
+    is_primary = models.BooleanField(default=False)
+
+    objects = UserSearchTokenManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'user', 'is_primary'], name='user_search_token_idx'),
+            models.Index(fields=['user', 'token', 'is_primary'], name='user_search_owner_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.user_id}"
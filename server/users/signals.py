@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import User, UserSearchToken
+
+SEARCH_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def rebuild_search_tokens(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    UserSearchToken.objects.rebuild([instance])
@@ -1,3 +1,51 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from api.models import Project, Role, Membership
+from .models import User, UserSearchToken
 
-# Create your tests here.
+
+class UserTypeaheadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='searcher@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ann = User.objects.create_user(
+            email='ann@example.com', password='password123', first_name='Ann', last_name='Lee')
+        self.anna = User.objects.create_user(
+            email='anna.smith@example.com', password='password123', first_name='Anna', last_name='Smith')
+        self.joanne = User.objects.create_user(
+            email='joanne@example.com', password='password123', first_name='Joanne', last_name='Annis')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/users/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [user['id'] for user in response.data]
+
+    def test_exact_matches_rank_before_prefix_and_word_matches(self):
+        ids = UserSearchToken.objects.ranked_user_ids('ann')
+        self.assertEqual(ids[:3], [self.ann.id, self.anna.id, self.joanne.id])
+
+    def test_substring_matches_fill_in_after_prefix_matches(self):
+        blacksmith = User.objects.create_user(email='blacksmith@example.com', password='password123')
+        self.assertEqual(UserSearchToken.objects.ranked_user_ids('smith'), [self.anna.id, blacksmith.id])
+        self.assertEqual(UserSearchToken.objects.ranked_user_ids('smith', limit=1), [self.anna.id])
+        self.assertEqual(self.search('smith@'), [str(self.anna.id), str(blacksmith.id)])
+
+    def test_tokens_follow_profile_changes(self):
+        self.joanne.last_name = 'Zimmer'
+        self.joanne.save()
+        # The generated username still contains "annis", so look up the full name.
+        self.assertNotIn(self.joanne.id, UserSearchToken.objects.ranked_user_ids('joanne annis'))
+        self.assertEqual(UserSearchToken.objects.ranked_user_ids('zimm'), [self.joanne.id])
+
+    def test_assignee_search_is_scoped_to_project_members(self):
+        project = Project.objects.create(creator=self.user, title='Project')
+        role = Role.objects.create(name='Member')
+        Membership.objects.create(user=self.user, project=project, role=role)
+        Membership.objects.create(user=self.anna, project=project, role=role)
+
+        self.assertEqual(self.search('ann'), [])
+        self.assertEqual(self.search('ann@'), [str(self.ann.id)])
+        self.assertEqual(self.search('ann', project_id=project.id), [])
+        self.assertEqual(self.search('anna.smith@ex', project_id=project.id), [str(self.anna.id)])
+        self.assertEqual(self.search('ann@', project_id=project.id), [])
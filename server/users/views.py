@@ -6,7 +6,8 @@ from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 
-from api.models import Membership
+from api.access import get_project_access
+from .models import UserSearchToken
 from .serializers import (
     UpdatePasswordSerializer,
     UserSerializer,
@@ -32,7 +33,6 @@ from google.oauth2 import id_token
 import random
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 import uuid
 from .utils import generate_unique_username
 
@@ -417,7 +417,20 @@ class ResetPasswordView(APIView):
         return Response({"error": "Invalid request parameters"}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserSearchAPIView(generics.ListAPIView):
+class UserTypeaheadMixin:
+    search_limit = 20
+
+    def search(self, query, **filters):
+        user_ids = [
+            user_id for user_id in UserSearchToken.objects.ranked_user_ids(
+                query, limit=self.search_limit + 1, user__is_active=True, **filters)
+            if user_id != self.request.user.id
+        ][:self.search_limit]
+        users = User.objects.in_bulk(user_ids)
+        return [users[user_id] for user_id in user_ids]
+
+
+class UserSearchAPIView(UserTypeaheadMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserSearchSerializer
 
@@ -426,11 +439,7 @@ class UserSearchAPIView(generics.ListAPIView):
         if not query:
             return User.objects.none()
 
-        return User.objects.filter(
-            Q(username__icontains=query) |
-            Q(email__icontains=query),
-            is_active=True
-        ).exclude(id=self.request.user.id).order_by('username')[:20]
+        return self.search(query)
 
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
@@ -441,7 +450,7 @@ class UserSearchAPIView(generics.ListAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class UserSearchForAddingAsAssigneeAPIView(generics.ListAPIView):
+class UserSearchForAddingAsAssigneeAPIView(UserTypeaheadMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserSearchSerializer
 
@@ -452,24 +461,10 @@ class UserSearchForAddingAsAssigneeAPIView(generics.ListAPIView):
         if not email_query or '@' not in email_query:
             return User.objects.none()
 
-        email_parts = email_query.split('@')
-        if len(email_parts) < 2:
-            return User.objects.none()
-
-        username_part = email_parts[0]
-        domain_part = email_parts[1]
-
-        queryset = User.objects.filter(
-            Q(email__iexact=email_query) |
-            Q(email__istartswith=f"{username_part}@") & Q(
-                email__icontains=domain_part),
-            is_active=True
-        ).exclude(id=self.request.user.id)
-
         if project_id:
-            if not Membership.objects.filter(user=self.request.user, project_id=project_id).exists():
+            if not get_project_access(self.request).is_member(project_id):
                 return User.objects.none()
 
-            queryset = queryset.filter(memberships__project_id=project_id)
+            return self.search(email_query, user__memberships__project_id=project_id)
 
-        return queryset.order_by('email')[:20]
+        return self.search(email_query)